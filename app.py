@@ -2,19 +2,16 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import json
-import os
-import datetime
-import io
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import matplotlib.gridspec as gridspec
-from matplotlib.lines import Line2D
-from matplotlib.patches import Rectangle
-from scipy.signal import find_peaks, butter, filtfilt, welch
-from scipy.ndimage import uniform_filter1d
 import warnings
 warnings.filterwarnings("ignore")
+from rba import charts, live, profiling, render
+from rba.cache import (cached_analyze, cached_cad, cache_key, derived, full_result,
+                       load_session, session_key, summary)
+from rba.charts import THEMES
+from rba.config import DEVICE_POSITIONS, LIVE_REFRESH_S, STAGES, LIVE_TOKEN
+from rba.history import (load_profile, save_profile, append_history, clear_history,
+                         history_cache, session_record)
+from rba.pipeline import StageTimer, demo_data
 
 # ─────────────────────────────────────────────
 # PAGE CONFIG
@@ -34,37 +31,14 @@ if "dark_mode" not in st.session_state:
 
 DM = st.session_state.dark_mode
 
-# Paletas
-if DM:
-    BG       = "#060608"
-    BG2      = "#0d0d10"
-    CARD     = "#111116"
-    BORDER   = "#1e1e28"
-    BORDER2  = "#2a2a38"
-    TEXT     = "#f0f0f5"
-    SUBTEXT  = "#5a5a72"
-    ACCENT   = "#C8FF00"   # lima eléctrico
-    ACCENT2  = "#00E5FF"   # cyan
-    GOOD     = "#39D98A"
-    WARN     = "#FFCB47"
-    BAD      = "#FF5C5C"
-    CHART_BG = "#0d0d10"
-    SHADOW   = "rgba(200,255,0,0.08)"
-else:
-    BG       = "#F5F5F0"
-    BG2      = "#EBEBЕ4"
-    CARD     = "#FFFFFF"
-    BORDER   = "#E0E0D8"
-    BORDER2  = "#CCCCС0"
-    TEXT     = "#111116"
-    SUBTEXT  = "#888880"
-    ACCENT   = "#5C8A00"
-    ACCENT2  = "#0077AA"
-    GOOD     = "#1A8A55"
-    WARN     = "#B8880A"
-    BAD      = "#CC2222"
-    CHART_BG = "#FFFFFF"
-    SHADOW   = "rgba(92,138,0,0.10)"
+# Paleta del tema activo
+PAL = THEMES["dark" if DM else "light"]
+BG, BG2, CARD     = PAL["BG"], PAL["BG2"], PAL["CARD"]
+BORDER, BORDER2   = PAL["BORDER"], PAL["BORDER2"]
+TEXT, SUBTEXT     = PAL["TEXT"], PAL["SUBTEXT"]
+ACCENT, ACCENT2   = PAL["ACCENT"], PAL["ACCENT2"]
+GOOD, WARN, BAD   = PAL["GOOD"], PAL["WARN"], PAL["BAD"]
+CHART_BG, SHADOW  = PAL["CHART_BG"], PAL["SHADOW"]
 
 # ─────────────────────────────────────────────
 # CSS PREMIUM
@@ -494,28 +468,8 @@ hr {{ border-color: var(--border) !important; margin: 1.5rem 0 !important; }}
 # ─────────────────────────────────────────────
 # CONSTANTES Y HELPERS
 # ─────────────────────────────────────────────
-SAMPLE_RATE  = 100
-HISTORY_FILE = "rba_sessions.json"
-PROFILE_FILE = "rba_profile.json"
-
-DEVICE_POSITIONS = {
-    "Pecho / Arnés":      {"gss_good": (0, 3),  "gss_warn": (3, 6)},
-    "Brazo / Muñeca":     {"gss_good": (1, 4),  "gss_warn": (4, 8)},
-    "Bolsillo / Cintura": {"gss_good": (2, 6),  "gss_warn": (6, 10)},
-    "Espalda / Canguro":  {"gss_good": (4, 9),  "gss_warn": (9, 13)},
-    "Mano (sostenido)":   {"gss_good": (3, 8),  "gss_warn": (8, 14)},
-}
-
 def scolor(val, good, warn, invert=False):
-    lo_g, hi_g = good; lo_w, hi_w = warn
-    if not invert:
-        if lo_g <= val <= hi_g: return GOOD
-        if lo_w <= val <= hi_w: return WARN
-        return BAD
-    else:
-        if val <= hi_g: return GOOD
-        if val <= hi_w: return WARN
-        return BAD
+    return charts.scolor(val, good, warn, invert, PAL)
 
 def slabel(c):
     return {GOOD: "ÓPTIMO", WARN: "MODERADO", BAD: "REVISAR"}.get(c, "—")
@@ -538,530 +492,91 @@ def mcard(label, value, unit, color, sublabel="", bar_frac=None, delay=0):
     </div>"""
 
 # ─────────────────────────────────────────────
-# PERSISTENCIA
+# FIGURAS (memoizadas por resultado y tema)
 # ─────────────────────────────────────────────
-def load_profile():
-    if os.path.exists(PROFILE_FILE):
-        with open(PROFILE_FILE) as f: return json.load(f)
-    return {"name":"","weight":70,"height":170,"goal":"Mejorar resistencia","level":"Intermedio","default_device":"Espalda / Canguro"}
-
-def save_profile(p):
-    with open(PROFILE_FILE,"w") as f: json.dump(p, f, indent=2)
-
-def load_history():
-    if os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE) as f: return json.load(f)
-    return []
-
-def append_history(s):
-    h = load_history(); h.append(s)
-    with open(HISTORY_FILE,"w") as f: json.dump(h, f, indent=2)
-
-# ─────────────────────────────────────────────
-# SIGNAL PROCESSING
-# ─────────────────────────────────────────────
-def butter_bp(data, lo, hi, fs, order=4):
-    nyq = fs/2
-    b,a = butter(order, [lo/nyq, min(hi/nyq,0.99)], btype='band')
-    return filtfilt(b,a,data)
-
-def butter_lp(data, cutoff, fs, order=4):
-    nyq=fs/2; b,a=butter(order, min(cutoff/nyq,0.99), btype='low')
-    return filtfilt(b,a,data)
-
-def est_fs(df):
-    if 'time' in df.columns and len(df)>10:
-        dt=np.median(np.diff(df['time'].values))
-        if dt>0: return round(1/dt)
-    return SAMPLE_RATE
-
-def load_csv(f):
+def cached_fig(builder, r, cad=False):
+    """Figura de un resumen; las señales se cargan solo si hay que construirla.
+    Las figuras cacheadas se comparten: no se deben mutar al mostrarlas."""
+    def build():
+        full = full_result(r)
+        return builder(full, PAL, cad_series=cached_cad(full)) if cad else builder(full, PAL)
     try:
-        df=pd.read_csv(f); df.columns=[c.strip().lower() for c in df.columns]
-        if 'seconds_elapsed' in df.columns:
-            df['time']=pd.to_numeric(df['seconds_elapsed'],errors='coerce')
-        else:
-            tc=next((c for c in df.columns if 'time' in c),None)
-            if tc:
-                raw=pd.to_numeric(df[tc],errors='coerce')
-                if raw.median()>1e12: raw=raw/1e9
-                df['time']=raw-raw.iloc[0]
-        am={}
-        for c in df.columns:
-            if c in ['x','accel_x','acceleration x (m/s^2)']: am[c]='x'
-            if c in ['y','accel_y','acceleration y (m/s^2)']: am[c]='y'
-            if c in ['z','accel_z','acceleration z (m/s^2)']: am[c]='z'
-            if c in ['speed','velocity']: am[c]='speed'
-            if c in ['altitude','alt','elevation']: am[c]='altitude'
-        df.rename(columns=am,inplace=True)
-        for ax in ['x','y','z']:
-            if ax in df.columns: df[ax]=pd.to_numeric(df[ax],errors='coerce')
-        df.dropna(subset=['time'],inplace=True); df.reset_index(drop=True,inplace=True)
-        return df
+        if "id" not in r: return build()
+        return derived.memo(fig_key(builder, r),build)
+    except LookupError as e:
+        st.warning(f"⚠  Gráficos no disponibles: {e}"); return None
+
+def fig_key(builder, r):
+    return cache_key(builder.__name__,r["id"],DM)
+
+def export_panel(r):
+    """Exportaciones a pedido: se renderizan en el pool de render.py y quedan en
+    cache por resultado y tema. Devuelve True si alguna sigue en curso."""
+    busy = False
+    for col, (fmt, (builder, mime)) in zip(st.columns(len(render.FORMATS), gap="small"),
+                                           render.FORMATS.items()):
+        key = fig_key(getattr(charts, builder), r)
+        with col:
+            data = derived.get(key)
+            if data is not None:
+                st.download_button(f"⬇  Descargar dashboard {fmt.upper()}", data,
+                                   f"rba_{r['date'][:10]}.{fmt}", mime,
+                                   key=f"dl_{fmt}", use_container_width=True)
+                continue
+            state = render.status(key)
+            if state in ("queued", "running"):
+                busy = True
+                st.button(f"⏳  {'En cola' if state=='queued' else 'Renderizando'} {fmt.upper()}...",
+                          key=f"busy_{fmt}", disabled=True, use_container_width=True)
+                continue
+            if state == "error":
+                st.caption(f"⚠  Falló la exportación: {render.error(key)}")
+            if st.button(f"🖼  Preparar dashboard {fmt.upper()}", key=f"prep_{fmt}",
+                         use_container_width=True):
+                try:
+                    full = full_result(r)
+                    render.submit(key, fmt, full, PAL, cached_cad(full))
+                except (LookupError, RuntimeError) as e:
+                    st.warning(f"⚠  {e}")
+                else:
+                    st.rerun()
+    return busy
+
+def live_panel(athlete, dev):
+    """Métricas en vivo de un atleta; con st.fragment se redibuja cada LIVE_REFRESH_S."""
+    snap = live.hub.snapshot(athlete)
+    if snap is None:
+        st.info("Sin datos de este atleta (sesión terminada o inactiva)."); return
+    dp = DEVICE_POSITIONS[dev]
+    gc = scolor(snap["gss_recent"], dp["gss_good"], dp["gss_warn"], invert=True)
+    cc = scolor(snap["cadence"], (170,185), (160,195))
+    ac = scolor(snap["asymmetry"], (0,5), (5,10), invert=True)
+    rc = scolor(snap["rei"], (65,100), (40,65))
+    fi = snap["fi"]
+    mins, secs = divmod(int(snap["elapsed"]), 60)
+    cards = [
+        ("TIEMPO", f"{mins}:{secs:02d}", f"{snap['steps']} pasos", ACCENT2, ""),
+        ("RUNNING ECONOMY", f"{snap['rei']:.0f}", "/100 · sesión", rc, slabel(rc)),
+        ("CADENCIA", f"{snap['cadence']:.0f}", "ppm", cc, "ÓPTIMA" if cc==GOOD else "REVISAR"),
+        ("GROUND SHOCK", f"{snap['gss_recent']:.1f}", f"m/s² · sesión {snap['gss']:.1f}", gc, slabel(gc)),
+        ("ASIMETRÍA", f"{snap['asymmetry']:.1f}", "%", ac, slabel(ac)),
+        ("FATIGUE INDEX", f"{fi:.2f}" if fi is not None else "N/A", "ventana actual", ACCENT, ""),
+    ]
+    cols = st.columns(len(cards), gap="small")
+    for col, (label, val, unit, color, sub) in zip(cols, cards):
+        with col: st.markdown(mcard(label, val, unit, color, sub), unsafe_allow_html=True)
+    fig = charts.plotly_live(snap, PAL)
+    if fig: st.plotly_chart(fig, use_container_width=True, key="live_chart")
+    lat = f" · detección p95 {snap['latency_p95_ms']/1000:.2f} s tras la pisada" if snap["latency_p95_ms"] else ""
+    st.caption(f"{snap['fs']} Hz · último bloque hace {snap['age_s']:.1f} s "
+               f"(procesado en {snap['process_ms']:.1f} ms){lat}")
+
+def _load(f, key):
+    try:
+        return load_session(f, key)
     except Exception as e:
         st.error(f"Error: {e}"); return None
 
-def demo_data(dur=600, fs=100):
-    t=np.linspace(0,dur,dur*fs); np.random.seed(42)
-    fat=np.linspace(1,1.4,len(t)); ch=2.83
-    z=np.sin(2*np.pi*ch*t)*0.8*fat+np.random.normal(0,.15,len(t))+9.81
-    x=np.sin(2*np.pi*ch*t+np.pi/4)*0.3*fat+np.random.normal(0,.1,len(t))
-    y=np.sin(2*np.pi*ch*t+np.pi/2)*0.15+np.random.normal(0,.08,len(t))
-    accel=pd.DataFrame({'time':t,'x':x,'y':y,'z':z})
-    gt=np.arange(0,dur,1)
-    gps=pd.DataFrame({'time':gt,'speed':3+0.5*np.sin(2*np.pi*gt/120)})
-    return accel, gps
-
-def preprocess(df):
-    fs=est_fs(df)
-    for ax in ['x','y','z']:
-        if ax in df.columns:
-            df[ax+'_filt']=butter_lp(df[ax].fillna(0), min(20,fs/2-1), fs)
-    if 'x_filt' in df.columns:
-        df['magnitude']=np.sqrt(df['x_filt']**2+df['y_filt']**2+(df['z_filt']-9.81)**2)
-    df['_fs']=fs; return df
-
-def detect_steps(accel):
-    fs=int(accel['_fs'].iloc[0]) if '_fs' in accel.columns else SAMPLE_RATE
-    raw=(np.sqrt(accel['x_filt']**2+accel['y_filt']**2+accel['z_filt']**2).values
-         if 'x_filt' in accel.columns else accel.get('magnitude',accel['z']).values)
-    sig=butter_bp(raw,1.5,4,fs)
-    env=uniform_filter1d(np.abs(sig),size=int(fs*0.1))
-    peaks,_=find_peaks(env,height=np.percentile(env,65),
-                       distance=int(fs*0.27),prominence=np.std(env)*0.5)
-    if len(peaks)<4:
-        peaks,_=find_peaks(env,height=np.mean(env),distance=int(fs*0.27),
-                           prominence=np.std(env)*0.2)
-    accel['step_signal']=sig; accel['step_envelope']=env
-    return peaks, accel['time'].values[peaks], np.abs(sig[peaks])
-
-def calc_rei(accel, peak_values):
-    z=(accel.get('z_filt',accel.get('z',pd.Series([9.81]*len(accel)))).values-9.81)
-    sr=max(np.percentile(np.abs(z),95),1e-6)
-    sv=max(0,1-np.var(z)/sr**2*3)
-    sc=max(0,1-np.std(peak_values)/(np.mean(np.abs(peak_values))+1e-6)*2) if len(peak_values)>4 else 0.5
-    return round((sv*0.6+sc*0.4)*100,1)
-
-def calc_gss(pv): return round(np.mean(np.abs(pv)),2)
-
-def calc_cad_asym(pt):
-    if len(pt)<4: return 0.0,0.0
-    iv=np.diff(pt); vc=(iv>=0.25)&(iv<=1.0)
-    ic=iv[vc] if vc.sum()>2 else iv
-    med=np.median(ic)
-    if med<=0: return 0.0,0.0
-    cad=round(60/med,1)
-    l,r=ic[0::2],ic[1::2]; n=min(len(l),len(r))
-    asym=abs(np.mean(l[:n])-np.mean(r[:n]))/med*100 if n>0 else 0
-    return cad, round(asym,2)
-
-def cad_over_time(pt, ws=40):
-    if len(pt)<5: return np.array([]),np.array([])
-    if len(pt)<ws+1: ws=max(10,len(pt)//3)
-    iv=np.diff(pt); tm=pt[1:]; cads,tout=[],[]
-    for i in range(len(iv)-ws+1):
-        w=iv[i:i+ws]; vl=(w>=0.27)&(w<=1.0)
-        if vl.sum()>ws*0.5:
-            cads.append(60/np.median(w[vl])); tout.append(tm[i+ws//2])
-    if len(cads)<3: return np.array([]),np.array([])
-    from scipy.ndimage import gaussian_filter1d
-    return np.array(tout), np.clip(gaussian_filter1d(np.array(cads),sigma=6),100,230)
-
-def calc_fi(accel, pt, pv, wm=2):
-    tt=accel['time'].max(); w=wm*60; ft,fv=[],[]
-    for ws in np.arange(0,min(tt,3600),w):
-        m=(pt>=ws)&(pt<ws+w); wp=pv[m]
-        if len(wp)<4: continue
-        fv.append(round(np.mean(np.abs(wp))*0.6+np.std(wp)*0.4,3))
-        ft.append(ws/60)
-    return ft,fv
-
-def analyze(accel_df, gps_df, dev_name):
-    dp=DEVICE_POSITIONS[dev_name]
-    accel=preprocess(accel_df.copy())
-    _,pt,pv=detect_steps(accel)
-    rei=calc_rei(accel,pv)
-    gss=calc_gss(pv)
-    cad,asym=calc_cad_asym(pt)
-    ft,fv=calc_fi(accel,pt,pv)
-    dur=accel['time'].max()/60
-    spd=(np.mean(gps_df['speed'].values) if gps_df is not None and 'speed' in gps_df.columns
-         else len(pt)/2/(dur*60) if dur>0 else 0)
-    slope=float(np.polyfit(ft,fv,1)[0]) if len(fv)>=2 else 0
-    return {
-        "accel":accel,"gps":gps_df,"pt":pt,"pv":pv,
-        "rei":rei,"gss":gss,"cadence":cad,"asymmetry":asym,
-        "fi_times":ft,"fi_values":fv,"dur":dur,"speed":spd,
-        "device":dev_name,"gss_good":dp["gss_good"],"gss_warn":dp["gss_warn"],
-        "fatigue_slope":slope,"steps":len(pt),
-        "date":datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-    }
-
-# ─────────────────────────────────────────────
-# GRÁFICOS INTERACTIVOS CON PLOTLY — VERSIÓN PREMIUM
-# ─────────────────────────────────────────────
-def plotly_radar(r):
-    """Figura separada solo para el radar chart."""
-    try:
-        import plotly.graph_objects as go
-        P = CHART_BG; G = BORDER; T = SUBTEXT
-        rei=r["rei"]; cad=r["cadence"]; gss=r["gss"]; asym=r["asymmetry"]
-
-        radar_cats = ["ECONOMY", "CADENCIA", "IMPACTO", "SIMETRÍA", "VELOCIDAD"]
-        radar_vals = [
-            float(rei),
-            float(np.clip((cad-120)/80*100, 0, 100)),
-            float(np.clip((1 - gss/20)*100, 0, 100)),
-            float(np.clip((1 - asym/20)*100, 0, 100)),
-            float(np.clip(r["speed"]/5*100, 0, 100)),
-        ]
-        rv = radar_vals + [radar_vals[0]]
-        rc = radar_cats + [radar_cats[0]]
-
-        fig = go.Figure()
-        fig.add_trace(go.Scatterpolar(
-            r=[100]*6, theta=rc, fill='toself',
-            fillcolor="rgba(255,255,255,0.02)",
-            line=dict(color=G, width=1), showlegend=False, hoverinfo='skip'
-        ))
-        fig.add_trace(go.Scatterpolar(
-            r=[80]*6, theta=rc, fill='toself',
-            fillcolor="rgba(200,255,0,0.04)",
-            line=dict(color=ACCENT, width=0.8, dash='dot'),
-            showlegend=False, hoverinfo='skip'
-        ))
-        fig.add_trace(go.Scatterpolar(
-            r=rv, theta=rc, fill='toself',
-            fillcolor="rgba(200,255,0,0.15)",
-            line=dict(color=ACCENT, width=2.5),
-            marker=dict(size=7, color=ACCENT, line=dict(color=P, width=1.5)),
-            showlegend=False,
-            hovertemplate="<b>%{theta}</b><br>%{r:.0f}/100<extra></extra>"
-        ))
-        fig.update_layout(
-            paper_bgcolor=P, font=dict(family="Space Grotesk, sans-serif", color=T, size=11),
-            height=300, margin=dict(l=20, r=20, t=40, b=20),
-            title=dict(text="PERFORMANCE RADAR", font=dict(color=ACCENT, size=10,
-                       family="Space Grotesk"), x=0.5),
-            polar=dict(
-                bgcolor=P,
-                radialaxis=dict(visible=True, range=[0,100], showticklabels=False,
-                                showline=False, gridcolor=G, gridwidth=0.8),
-                angularaxis=dict(tickfont=dict(size=9, color=T, family="Space Grotesk"),
-                                 linecolor=G, gridcolor=G),
-            )
-        )
-        return fig
-    except Exception:
-        return None
-
-
-def plotly_charts(r):
-    """3 gráficas XY: cadencia, fatigue, velocidad."""
-    try:
-        import plotly.graph_objects as go
-        from plotly.subplots import make_subplots
-
-        pt=r["pt"]; pv=r["pv"]
-        ft=r["fi_times"]; fv=r["fi_values"]
-        cad=r["cadence"]; gps=r["gps"]
-        t_cad, cad_v = cad_over_time(pt)
-
-        P = CHART_BG; G = BORDER; T = SUBTEXT
-        FONT = dict(family="Space Grotesk, sans-serif", color=T, size=11)
-        cc = scolor(cad,(170,185),(160,195))
-
-        fig = make_subplots(
-            rows=1, cols=3,
-            subplot_titles=["CADENCIA EN EL TIEMPO", "FATIGUE INDEX", "VELOCIDAD GPS"],
-            horizontal_spacing=0.07
-        )
-
-        # ── Cadencia ──
-        if len(t_cad) > 2:
-            x_range = [float(t_cad[0]/60), float(t_cad[-1]/60)]
-            # Zona optima como banda
-            fig.add_trace(go.Scatter(
-                x=x_range + x_range[::-1], y=[185,185,170,170],
-                fill='toself', fillcolor="rgba(57,217,138,0.08)",
-                line=dict(width=0), showlegend=False, hoverinfo='skip'
-            ), row=1, col=1)
-            # Linea promedio
-            fig.add_trace(go.Scatter(
-                x=x_range, y=[float(cad), float(cad)],
-                mode='lines', line=dict(color=ACCENT, dash='dot', width=1.2),
-                showlegend=False, hoverinfo='skip'
-            ), row=1, col=1)
-            # Cadencia principal
-            fig.add_trace(go.Scatter(
-                x=t_cad/60, y=cad_v, mode='lines',
-                line=dict(color=cc, width=2.5, shape='spline'),
-                fill='tozeroy', fillcolor="rgba(57,217,138,0.06)",
-                hovertemplate="<b>%{y:.0f} ppm</b><br>%{x:.1f} min<extra></extra>"
-            ), row=1, col=1)
-
-        # ── Fatigue ──
-        if ft and fv:
-            fi_arr=np.array(fv); fi_t=np.array(ft)
-            sl=np.polyfit(fi_t,fi_arr,1)
-            tc=WARN if sl[0]>0.0001 else (GOOD if sl[0]<-0.0001 else ACCENT)
-            trend=np.poly1d(sl)(fi_t)
-            fig.add_trace(go.Scatter(
-                x=fi_t, y=fi_arr, mode='lines+markers',
-                line=dict(color=tc, width=2.5, shape='spline'),
-                marker=dict(size=6, color=P, line=dict(color=tc, width=2)),
-                fill='tozeroy', fillcolor="rgba(255,203,71,0.06)",
-                hovertemplate="<b>%{y:.3f}</b><br>%{x:.1f} min<extra></extra>"
-            ), row=1, col=2)
-            fig.add_trace(go.Scatter(
-                x=fi_t, y=trend, mode='lines',
-                line=dict(color=ACCENT, dash='dash', width=1.5),
-                showlegend=False,
-                hovertemplate="tendencia: %{y:.3f}<extra></extra>"
-            ), row=1, col=2)
-
-        # ── Velocidad ──
-        if gps is not None and 'speed' in gps.columns:
-            tg=gps['time'].values/60; sp=gps['speed'].values
-            fig.add_trace(go.Scatter(
-                x=tg, y=sp, mode='lines',
-                line=dict(color=ACCENT, width=2.5, shape='spline'),
-                fill='tozeroy', fillcolor="rgba(200,255,0,0.07)",
-                hovertemplate="<b>%{y:.2f} m/s</b><br>%{x:.1f} min<extra></extra>"
-            ), row=1, col=3)
-            avg_sp = float(np.mean(sp))
-            fig.add_trace(go.Scatter(
-                x=[float(tg[0]), float(tg[-1])], y=[avg_sp, avg_sp],
-                mode='lines', line=dict(color=T, dash='dot', width=1),
-                showlegend=False, hoverinfo='skip'
-            ), row=1, col=3)
-        elif len(pv) > 4:
-            imp=np.abs(pv)
-            counts,bins=np.histogram(imp,bins=40)
-            fig.add_trace(go.Bar(
-                x=(bins[:-1]+bins[1:])/2, y=counts,
-                marker_color=ACCENT, opacity=0.6,
-                hovertemplate="<b>%{x:.1f} m/s²</b><br>%{y} pasos<extra></extra>"
-            ), row=1, col=3)
-
-        fig.update_layout(
-            paper_bgcolor=P, plot_bgcolor=P, font=FONT,
-            showlegend=False, height=300,
-            margin=dict(l=10, r=10, t=40, b=30),
-        )
-        for i in range(1,4):
-            fig.update_xaxes(showgrid=True, gridcolor=G, gridwidth=0.5,
-                             zeroline=False, tickfont=dict(size=9, color=T),
-                             title_text="min", title_font=dict(size=9, color=T),
-                             linecolor=G, row=1, col=i)
-            fig.update_yaxes(showgrid=True, gridcolor=G, gridwidth=0.5,
-                             zeroline=False, tickfont=dict(size=9, color=T),
-                             linecolor=G, row=1, col=i)
-        for ann in fig.layout.annotations:
-            ann.font = dict(color=ACCENT, size=10, family="Space Grotesk")
-        return fig
-    except ImportError:
-        return None
-
-def plotly_comparison(history, n):
-    try:
-        import plotly.graph_objects as go
-        from plotly.subplots import make_subplots
-        h=history[-n:]
-        labels=[s["date"][5:16] for s in h]
-        x=list(range(len(labels)))
-        metrics=[
-            ("REI",      [s["rei"]       for s in h], GOOD,  "/100"),
-            ("GROUND SHOCK",[s["gss"]    for s in h], BAD,   "m/s²"),
-            ("CADENCIA", [s["cadence"]   for s in h], ACCENT,"ppm"),
-            ("ASIMETRÍA",[s["asymmetry"] for s in h], WARN,  "%"),
-        ]
-        fig=make_subplots(rows=2,cols=2,
-                          subplot_titles=[m[0] for m in metrics],
-                          horizontal_spacing=0.08, vertical_spacing=0.14)
-        positions=[(1,1),(1,2),(2,1),(2,2)]
-        for (row,col),(title,vals,color,unit) in zip(positions,metrics):
-            fig.add_trace(go.Bar(
-                x=labels, y=vals, marker_color=color,
-                opacity=0.3, showlegend=False,
-                hovertemplate=f"%{{y}}{unit}<extra></extra>"
-            ), row=row, col=col)
-            fig.add_trace(go.Scatter(
-                x=labels, y=vals, mode='lines+markers',
-                line=dict(color=color, width=2.5),
-                marker=dict(size=7, color=CHART_BG, line=dict(color=color,width=2)),
-                showlegend=False,
-                hovertemplate=f"%{{y}}{unit}<extra></extra>"
-            ), row=row, col=col)
-            if len(vals)>=2:
-                tr=np.poly1d(np.polyfit(x,vals,1))(x)
-                fig.add_trace(go.Scatter(
-                    x=labels, y=tr, mode='lines',
-                    line=dict(color=TEXT, dash='dot', width=1), opacity=0.3,
-                    showlegend=False
-                ), row=row, col=col)
-        fig.update_layout(
-            paper_bgcolor=CHART_BG, plot_bgcolor=CHART_BG,
-            font=dict(family="Space Grotesk", color=SUBTEXT, size=11),
-            height=500, margin=dict(l=10,r=10,t=50,b=20)
-        )
-        for ann in fig.layout.annotations:
-            ann.font.color=ACCENT; ann.font.size=11
-        fig.update_xaxes(showgrid=False, tickfont=dict(size=8, color=SUBTEXT),
-                         tickangle=-30)
-        fig.update_yaxes(showgrid=True, gridcolor=BORDER, gridwidth=0.5,
-                         zeroline=False, tickfont=dict(size=8, color=SUBTEXT))
-        return fig
-    except ImportError:
-        return None
-
-# ─────────────────────────────────────────────
-# MATPLOTLIB DASHBOARD
-# ─────────────────────────────────────────────
-def build_fig(r):
-    pt=r["pt"]; rei=r["rei"]; gss=r["gss"]
-    cad=r["cadence"]; asym=r["asymmetry"]
-    ft=r["fi_times"]; fv=r["fi_values"]
-    spd=r["speed"]; dur=r["dur"]
-    gss_g=r["gss_good"]; gss_w=r["gss_warn"]
-    gps=r["gps"]; date_str=r["date"]
-
-    rc=scolor(rei,(65,100),(40,65))
-    gc=scolor(gss,gss_g,gss_w,invert=True)
-    cc=scolor(cad,(170,185),(160,195))
-    ac=scolor(asym,(0,5),(5,10),invert=True)
-
-    fi_arr=np.array(fv) if fv else np.array([])
-    fi_t  =np.array(ft) if ft else np.array([])
-    if len(fi_arr)>1:
-        slope=np.polyfit(fi_t,fi_arr,1)[0]
-        ftc=WARN if slope>0.0001 else (GOOD if slope<-0.0001 else ACCENT)
-        fvs=f"{fi_arr[-1]:.2f}"; fsym="▲" if slope>0.0001 else ("▼" if slope<-0.0001 else "—")
-    else:
-        ftc=SUBTEXT; fvs="N/A"; fsym="—"
-
-    plt.rcParams.update({'font.family':'monospace','figure.facecolor':BG,'axes.facecolor':BG})
-    fig=plt.figure(figsize=(20,11),facecolor=BG)
-    gs=gridspec.GridSpec(3,1,figure=fig,height_ratios=[0.09,0.44,0.44],
-                         hspace=0.08,left=0.03,right=0.97,top=0.96,bottom=0.04)
-    gsc=gridspec.GridSpecFromSubplotSpec(1,6,subplot_spec=gs[1],wspace=0.025)
-
-    def dcard(ax,label,vstr,unit,color,sub='',bf=None):
-        ax.set_facecolor(CARD)
-        for sp in ax.spines.values(): sp.set_edgecolor(BORDER); sp.set_linewidth(0.5)
-        ax.axis('off'); ax.set_xlim(0,1); ax.set_ylim(0,1)
-        ax.add_patch(Rectangle((0,0.945),1,0.055,color=color,alpha=0.9,
-                               transform=ax.transAxes,clip_on=False,zorder=5))
-        ax.text(0.5,0.82,label,ha='center',va='center',color=SUBTEXT,
-                fontsize=7.5,fontfamily='monospace',transform=ax.transAxes)
-        ax.text(0.5,0.50,vstr,ha='center',va='center',color=color,
-                fontsize=28,fontweight='bold',fontfamily='monospace',
-                transform=ax.transAxes)
-        ax.text(0.5,0.24,unit,ha='center',va='center',color=SUBTEXT,
-                fontsize=8.5,fontfamily='monospace',transform=ax.transAxes)
-        if sub:
-            ax.text(0.5,0.09,sub,ha='center',va='center',color=color,
-                    fontsize=7,fontfamily='monospace',transform=ax.transAxes)
-        if bf is not None:
-            bf=float(np.clip(bf,0,1))
-            ax.add_patch(Rectangle((0.06,0.022),0.88,0.04,
-                                   color=BORDER,transform=ax.transAxes,clip_on=False))
-            ax.add_patch(Rectangle((0.06,0.022),0.88*bf,0.04,
-                                   color=color,alpha=0.7,transform=ax.transAxes,clip_on=False))
-
-    # HEADER
-    ax_h=fig.add_subplot(gs[0]); ax_h.axis('off'); ax_h.set_facecolor(BG)
-    ax_h.add_line(Line2D([0,0],[0,1],color=ACCENT,linewidth=3,
-                         transform=ax_h.transAxes,clip_on=False))
-    ax_h.text(0.022,0.62,'RUNNING BIOMECHANICS',ha='left',va='center',
-              color=TEXT,fontsize=18,fontweight='bold',fontfamily='monospace',
-              transform=ax_h.transAxes)
-    ax_h.text(0.022,0.18,f"{date_str}  ·  {r['steps']:,} STEPS  ·  {dur:.1f} MIN",
-              ha='left',va='center',color=SUBTEXT,fontsize=8,fontfamily='monospace',
-              transform=ax_h.transAxes)
-    ax_h.text(0.98,0.55,f"{rei:.0f}",ha='right',va='center',color=rc,
-              fontsize=38,fontweight='bold',fontfamily='monospace',
-              transform=ax_h.transAxes)
-    ax_h.text(0.98,0.12,'REI SCORE',ha='right',va='center',color=SUBTEXT,
-              fontsize=7.5,fontfamily='monospace',transform=ax_h.transAxes)
-    ax_h.add_line(Line2D([0,1],[0,0],color=BORDER,linewidth=0.8,
-                         transform=ax_h.transAxes,clip_on=False))
-
-    # 6 TARJETAS
-    ca=[fig.add_subplot(gsc[i]) for i in range(6)]
-    mp=1000/spd/60 if spd>0 else 0
-    mp_m,mp_s=int(mp),int((mp%1)*60)
-    dcard(ca[0],'RUNNING ECONOMY',f'{rei:.0f}','/100',rc,
-          sub='BUENO' if rc==GOOD else 'MODERADO' if rc==WARN else 'MEJORAR',
-          bf=rei/100)
-    dcard(ca[1],'GROUND SHOCK',f'{gss:.1f}','m/s²',gc,
-          sub='BUENO' if gc==GOOD else 'MODERADO' if gc==WARN else 'ALTO',
-          bf=1-np.clip(gss/20,0,1))
-    dcard(ca[2],'CADENCIA',f'{cad:.0f}','ppm',cc,
-          sub='ÓPTIMA' if cc==GOOD else 'REVISAR',
-          bf=np.clip((cad-120)/100,0,1))
-    dcard(ca[3],'ASIMETRÍA',f'{asym:.1f}','%',ac,
-          sub='OK' if ac==GOOD else 'LEVE' if ac==WARN else 'ALTO',
-          bf=1-np.clip(asym/20,0,1))
-    dcard(ca[4],'VELOCIDAD',f'{spd:.2f}','m/s',ACCENT2,
-          sub=f'{mp_m}m {mp_s:02d}s /km',
-          bf=np.clip(spd/5,0,1))
-    dcard(ca[5],'FATIGUE INDEX',fvs,fsym,ftc,
-          sub='ESTABLE' if fsym=='—' else 'AUMENTANDO' if fsym=='▲' else 'BAJANDO')
-
-    # FILA INFERIOR — 3 mini gráficos matplotlib
-    gsb=gridspec.GridSpecFromSubplotSpec(1,3,subplot_spec=gs[2],wspace=0.04)
-
-    def schart(ax,title,accent):
-        ax.set_facecolor(CARD)
-        for sp in ax.spines.values(): sp.set_edgecolor(BORDER); sp.set_linewidth(0.4)
-        ax.tick_params(labelsize=7,colors=SUBTEXT,length=2)
-        ax.grid(True,color=BORDER,linewidth=0.4,alpha=0.8)
-        ax.add_line(Line2D([0,1],[1,1],color=accent,linewidth=1.5,
-                           transform=ax.transAxes,clip_on=False))
-        ax.text(0.015,0.93,title,transform=ax.transAxes,color=accent,
-                fontsize=8,fontweight='bold',va='top',fontfamily='monospace')
-
-    ax_c=fig.add_subplot(gsb[0])
-    tc,cv=cad_over_time(pt)
-    if len(tc)>2:
-        ax_c.fill_between(tc/60,cv,cv.min()-5,alpha=0.08,color=cc)
-        ax_c.plot(tc/60,cv,color=cc,linewidth=1.5,alpha=0.9)
-        ax_c.axhspan(170,185,alpha=0.06,color=GOOD)
-        ax_c.axhline(cad,color=ACCENT,linewidth=0.8,linestyle='--',alpha=0.6)
-        ax_c.set_ylim(max(130,cv.min()-10),min(220,cv.max()+10))
-        ax_c.set_xlabel('min',fontsize=7,color=SUBTEXT)
-    schart(ax_c,'CADENCIA  [ppm]',cc)
-
-    ax_f=fig.add_subplot(gsb[1])
-    if len(fi_arr)>1:
-        ax_f.fill_between(fi_t,fi_arr,fi_arr.min()-.01,alpha=0.10,color=ftc)
-        ax_f.plot(fi_t,fi_arr,color=ftc,linewidth=1.5,marker='o',markersize=4,
-                  markerfacecolor=CARD,markeredgecolor=ftc,markeredgewidth=1.2)
-        ax_f.plot(fi_t,np.poly1d(np.polyfit(fi_t,fi_arr,1))(fi_t),
-                  '--',color=ACCENT,linewidth=0.9,alpha=0.6)
-        ax_f.set_xlabel('min',fontsize=7,color=SUBTEXT)
-    schart(ax_f,'FATIGUE INDEX',ftc)
-
-    ax_s=fig.add_subplot(gsb[2])
-    if gps is not None and 'speed' in gps.columns:
-        tg=gps['time'].values/60; sp=gps['speed'].values
-        ax_s.fill_between(tg,sp,sp.min()*.98,alpha=0.10,color=ACCENT)
-        ax_s.plot(tg,sp,color=ACCENT,linewidth=1.5,alpha=0.9)
-        ax_s.axhline(np.mean(sp),color=SUBTEXT,linewidth=0.8,linestyle='--',alpha=0.6)
-        ax_s.set_xlabel('min',fontsize=7,color=SUBTEXT)
-        schart(ax_s,'VELOCIDAD  [m/s]',ACCENT)
-    elif len(pv)>4:
-        imp=np.abs(pv)
-        ax_s.hist(imp,bins=35,color=ACCENT,alpha=0.5,edgecolor='none')
-        ax_s.axvline(np.mean(imp),color=TEXT,linewidth=1,linestyle='--',alpha=0.6)
-        ax_s.set_xlabel('m/s²',fontsize=7,color=SUBTEXT)
-        schart(ax_s,'DISTRIBUCIÓN IMPACTO',ACCENT)
-    else:
-        schart(ax_s,'VELOCIDAD  [m/s]',ACCENT)
-
-    plt.tight_layout(pad=0); return fig
-
 # ─────────────────────────────────────────────
 # SIDEBAR
 # ─────────────────────────────────────────────
@@ -1079,6 +594,7 @@ with st.sidebar:
         "🏃  Nueva sesión",
         "📊  Historial",
         "👥  Comparar",
+        "📡  En vivo",
         "👤  Perfil",
     ], label_visibility="collapsed")
 
@@ -1104,8 +620,8 @@ with st.sidebar:
         </div>""", unsafe_allow_html=True)
 
     # Stats rápidas en sidebar
-    history = load_history()
-    if history:
+    hstats = history_cache.stats()
+    if hstats["count"]:
         st.markdown(f"""
         <div style="margin-top:1rem; padding:0.8rem; background:{CARD};
              border:1px solid {BORDER}; border-radius:6px;">
@@ -1114,17 +630,17 @@ with st.sidebar:
           <div style="display:flex; justify-content:space-between; align-items:center;">
             <div style="text-align:center">
               <div style="color:{ACCENT}; font-size:1.2rem; font-weight:800;
-                   font-family:'Space Grotesk'">{len(history)}</div>
+                   font-family:'Space Grotesk'">{hstats['count']}</div>
               <div style="color:{SUBTEXT}; font-size:0.58rem; font-family:'Space Grotesk'">SESIONES</div>
             </div>
             <div style="text-align:center">
               <div style="color:{ACCENT}; font-size:1.2rem; font-weight:800;
-                   font-family:'Space Grotesk'">{np.mean([s['rei'] for s in history]):.0f}</div>
+                   font-family:'Space Grotesk'">{hstats['rei_mean']:.0f}</div>
               <div style="color:{SUBTEXT}; font-size:0.58rem; font-family:'Space Grotesk'">REI MEDIO</div>
             </div>
             <div style="text-align:center">
               <div style="color:{ACCENT}; font-size:1.2rem; font-weight:800;
-                   font-family:'Space Grotesk'">{np.mean([s['cadence'] for s in history]):.0f}</div>
+                   font-family:'Space Grotesk'">{hstats['cadence_mean']:.0f}</div>
               <div style="color:{SUBTEXT}; font-size:0.58rem; font-family:'Space Grotesk'">CAD MEDIA</div>
             </div>
           </div>
@@ -1161,36 +677,32 @@ if "Nueva" in page:
 
     if st.button("▶  ANALIZAR SESIÓN", use_container_width=True):
         prog = st.progress(0, text="Iniciando análisis...")
-        import time
-
-        prog.progress(15, "Cargando datos...")
-        time.sleep(0.2)
+        timer = StageTimer(lambda pct, text: prog.progress(pct, text))
 
         if use_demo or accel_f is None:
-            adf, gdf = demo_data()
+            akey, gkey, load = "demo", None, demo_data
             st.info("⚡ Usando datos de demostración")
         else:
-            adf = load_csv(accel_f)
-            gdf = load_csv(gps_f) if gps_f else None
-
-        if adf is not None:
-            prog.progress(35, "Preprocesando señal...")
-            time.sleep(0.2)
-            prog.progress(55, "Detectando pisadas...")
-            time.sleep(0.2)
-            r = analyze(adf, gdf, dev)
-            prog.progress(80, "Calculando métricas...")
-            time.sleep(0.2)
-            st.session_state["last_result"] = r
-            append_history({
-                "date":r["date"],"duration":round(r["dur"],1),
-                "steps":r["steps"],"device":r["device"],
-                "rei":r["rei"],"gss":r["gss"],"cadence":r["cadence"],
-                "asymmetry":r["asymmetry"],"fatigue_slope":r["fatigue_slope"],
-                "speed":round(r["speed"],2),
-            })
+            akey = session_key(accel_f)
+            gkey = session_key(gps_f) if gps_f else None
+            load = lambda: (_load(accel_f, akey),
+                            _load(gps_f, gkey) if gps_f else None)
+
+        if profiling.is_enabled():
+            with profiling.trace(akey[:12]) as tr:
+                r = cached_analyze(akey, gkey, dev, load, timer)
+            if r is not None:
+                r["profile"] = tr.chrome_trace()
+                try: tr.save()
+                except OSError: pass
+        else:
+            r = cached_analyze(akey, gkey, dev, load, timer)
+        if r is not None:
+            st.session_state["last_result"] = summary(r)   # las señales quedan en el cache compartido
+            prog.progress(*STAGES["history"])
+            # una sola escritura con los tiempos del análisis; la del historial va al profiler (@profiled)
+            append_history(session_record(r, profile.get("name")))
             prog.progress(100, "¡Listo!")
-            time.sleep(0.3)
             prog.empty()
             st.success("✓  Análisis completado")
 
@@ -1250,27 +762,45 @@ if "Nueva" in page:
 
         col_radar, col_charts = st.columns([1, 2], gap="large")
         with col_radar:
-            fig_radar = plotly_radar(r)
+            fig_radar = cached_fig(charts.plotly_radar, r)
             if fig_radar:
                 st.plotly_chart(fig_radar, use_container_width=True)
         with col_charts:
-            fig_plotly = plotly_charts(r)
+            fig_plotly = cached_fig(charts.plotly_charts, r, cad=True)
             if fig_plotly:
                 st.plotly_chart(fig_plotly, use_container_width=True)
-            else:
-                mfig = build_fig(r)
-                st.pyplot(mfig, use_container_width=True)
-                plt.close(mfig)
+            elif (png := cached_fig(charts.dashboard_png, r, cad=True)):
+                st.image(png, use_container_width=True)
+
+        # ── TIEMPOS ──
+        if r.get("timings"):
+            with st.expander("⏱  Tiempos de análisis"):
+                tdf = pd.DataFrame(r["timings"])
+                st.dataframe(tdf.rename(columns={"stage":"Etapa","wall_ms":"Pared (ms)",
+                                                 "cpu_ms":"CPU del proceso (ms)"}),
+                             use_container_width=True, hide_index=True)
+                st.caption(f"Total: {tdf['wall_ms'].sum():.0f} ms de pared · "
+                           f"{tdf['cpu_ms'].sum():.0f} ms de CPU de este proceso "
+                           "(no incluye los procesos auxiliares del análisis por bloques)")
+                if r.get("profile"):
+                    st.download_button("⬇  Trace de rendimiento (JSON)",
+                                       json.dumps(r["profile"]),
+                                       f"rba_trace_{r['date'][:10]}.json", "application/json")
+                if profiling.is_enabled():
+                    st.caption("Percentiles por función en este proceso")
+                    st.dataframe(pd.DataFrame(profiling.stats()).T, use_container_width=True)
 
         # ── DESCARGAR DASHBOARD ──
         st.markdown("<div style='height:0.5rem'></div>", unsafe_allow_html=True)
-        buf = io.BytesIO()
-        dfig = build_fig(r)
-        dfig.savefig(buf, format='png', dpi=150, bbox_inches='tight', facecolor=BG)
-        plt.close(dfig); buf.seek(0)
-        st.download_button("⬇  Descargar dashboard PNG", buf,
-                           f"rba_{r['date'][:10]}.png", "image/png",
-                           use_container_width=True)
+        # Los dashboards (3000×1650) solo se renderizan a pedido y fuera del hilo del script
+        if any(render.status(fig_key(getattr(charts, b), r)) in ("queued", "running")
+               for b, _ in render.FORMATS.values()):
+            if hasattr(st, "fragment"):
+                st.fragment(run_every=1.0)(export_panel)(r)   # solo este bloque se refresca
+            elif export_panel(r):
+                st.button("↻  Actualizar estado")
+        else:
+            export_panel(r)
 
         # ── RECOMENDACIONES ──
         st.markdown("<div style='height:0.5rem'></div>", unsafe_allow_html=True)
@@ -1314,7 +844,7 @@ if "Nueva" in page:
 # PÁGINA: HISTORIAL
 # ═══════════════════════════════════════════════
 elif "Historial" in page:
-    history = load_history()
+    history, hstats = history_cache.sessions(), history_cache.stats()
     st.markdown('<div class="stitle animate-in">// HISTORIAL DE SESIONES</div>', unsafe_allow_html=True)
 
     if not history:
@@ -1332,10 +862,10 @@ elif "Historial" in page:
         # KPIs
         c1,c2,c3,c4 = st.columns(4, gap="small")
         kpis = [
-            (str(len(history)), "SESIONES TOTALES"),
-            (f"{np.mean([s['rei'] for s in history]):.1f}", "REI PROMEDIO"),
-            (f"{np.mean([s['cadence'] for s in history]):.0f} ppm", "CADENCIA MEDIA"),
-            (f"{max(history,key=lambda x:x['rei'])['rei']:.0f}", "MEJOR REI"),
+            (str(hstats["count"]), "SESIONES TOTALES"),
+            (f"{hstats['rei_mean']:.1f}", "REI PROMEDIO"),
+            (f"{hstats['cadence_mean']:.0f} ppm", "CADENCIA MEDIA"),
+            (f"{hstats['rei_best']:.0f}", "MEJOR REI"),
         ]
         for col,(val,label) in zip([c1,c2,c3,c4],kpis):
             with col:
@@ -1357,14 +887,14 @@ elif "Historial" in page:
 
         st.markdown("<div style='height:0.5rem'></div>", unsafe_allow_html=True)
         if st.button("🗑  Borrar historial", use_container_width=False):
-            if os.path.exists(HISTORY_FILE): os.remove(HISTORY_FILE)
+            clear_history()
             st.rerun()
 
 # ═══════════════════════════════════════════════
 # PÁGINA: COMPARAR
 # ═══════════════════════════════════════════════
 elif "Comparar" in page:
-    history = load_history()
+    history = history_cache.sessions()[-10:]
     st.markdown('<div class="stitle animate-in">// COMPARAR SESIONES</div>', unsafe_allow_html=True)
 
     if len(history) < 2:
@@ -1376,11 +906,12 @@ elif "Comparar" in page:
           </div>
         </div>""", unsafe_allow_html=True)
     else:
-        n = st.slider("Sesiones a comparar (más recientes)", 2, min(10,len(history)),
-                      min(5,len(history)), label_visibility="visible")
+        n = 2 if len(history) == 2 else st.slider(
+            "Sesiones a comparar (más recientes)", 2, len(history),
+            min(5,len(history)), label_visibility="visible")
         sel = history[-n:]
 
-        fig_comp = plotly_comparison(history, n)
+        fig_comp = charts.plotly_comparison(history, n, PAL)
         if fig_comp:
             st.plotly_chart(fig_comp, use_container_width=True)
 
@@ -1416,6 +947,44 @@ elif "Comparar" in page:
                   </div>
                 </div>""", unsafe_allow_html=True)
 
+# ═══════════════════════════════════════════════
+# PÁGINA: EN VIVO
+# ═══════════════════════════════════════════════
+elif "vivo" in page:
+    st.markdown('<div class="stitle animate-in">// EN VIVO</div>', unsafe_allow_html=True)
+    try:
+        host, port = live.start_server()
+    except (OSError, ValueError) as e:
+        st.error(f"No se pudo abrir el puerto de ingesta: {e}"); st.stop()
+
+    athletes = [a["athlete"] for a in live.hub.athletes()]
+    if not athletes:
+        st.markdown(f"""
+        <div style="text-align:center; padding:3rem; color:{SUBTEXT};">
+          <div style="font-size:3rem; margin-bottom:0.5rem">📡</div>
+          <div style="font-family:'Space Grotesk'; font-size:1rem; letter-spacing:0.1em">
+            ESPERANDO DATOS EN http://{host}:{port}/ingest/&lt;atleta&gt;
+          </div>
+        </div>""", unsafe_allow_html=True)
+        st.code(f'python -m rba.live simulate --athlete "{profile.get("name") or "Simulado"}" '
+                f'--url http://{host}:{port}' + (' --token "$RBA_LIVE_TOKEN"' if LIVE_TOKEN else ''),
+                language="bash")
+        st.button("↻  Buscar atletas")
+    else:
+        c1, c2 = st.columns(2, gap="large")
+        with c1:
+            who = st.selectbox("Atleta", athletes,
+                               index=athletes.index(profile["name"]) if profile.get("name") in athletes else 0)
+        with c2:
+            ldev = st.selectbox("Posición del dispositivo", list(DEVICE_POSITIONS.keys()),
+                                index=list(DEVICE_POSITIONS.keys()).index(
+                                    profile.get("default_device","Espalda / Canguro")), key="live_dev")
+        if hasattr(st, "fragment"):
+            st.fragment(run_every=LIVE_REFRESH_S)(live_panel)(who, ldev)   # solo el panel se refresca
+        else:
+            live_panel(who, ldev)
+            st.button("↻  Actualizar")
+
 # ═══════════════════════════════════════════════
 # PÁGINA: PERFIL
 # ═══════════════════════════════════════════════
@@ -1451,22 +1020,17 @@ elif "Perfil" in page:
             st.rerun()
 
     # Stats acumuladas
-    history = load_history()
-    if history and profile.get("name"):
+    hstats = history_cache.stats()
+    if hstats["count"] and profile.get("name"):
         st.markdown("<div style='height:0.5rem'></div>", unsafe_allow_html=True)
         st.markdown('<div class="stitle">// TUS ESTADÍSTICAS</div>', unsafe_allow_html=True)
 
-        total_h   = sum(s.get("duration",0) for s in history) / 60
-        total_km  = sum(s.get("speed",0)*s.get("duration",0)*60/1000 for s in history)
-        best_rei  = max(s["rei"] for s in history)
-        streak    = len(history)
-
         sc1,sc2,sc3,sc4 = st.columns(4, gap="small")
         stats=[
-            (f"{len(history)}", "SESIONES"),
-            (f"{total_h:.1f}h", "TIEMPO TOTAL"),
-            (f"{total_km:.0f}km", "KM ESTIMADOS"),
-            (f"{best_rei:.0f}", "MEJOR REI"),
+            (f"{hstats['count']}", "SESIONES"),
+            (f"{hstats['hours']:.1f}h", "TIEMPO TOTAL"),
+            (f"{hstats['km']:.0f}km", "KM ESTIMADOS"),
+            (f"{hstats['rei_best']:.0f}", "MEJOR REI"),
         ]
         for col,(val,label) in zip([sc1,sc2,sc3,sc4],stats):
             with col:
@@ -0,0 +1,30 @@
+"""Motor de análisis de +Statistics · Running Biomechanics Analyzer (RBA).
+
+Importable sin Streamlit; scipy, pandas, plotly y matplotlib se cargan solo al
+usarse, así que ``import rba`` es casi instantáneo:
+
+    from rba import load_csv, analyze
+    r = analyze(load_csv("sesion.csv"), None, "Espalda / Canguro")
+"""
+
+_EXPORTS = {
+    "analyze": "pipeline", "demo_data": "pipeline", "StageTimer": "pipeline",
+    "load_csv": "ingest",
+    "load_session": "cache", "cached_analyze": "cache",
+    "preprocess": "dsp", "detect_steps": "dsp", "butter_bp": "dsp", "butter_lp": "dsp",
+    "filters": "dsp", "OnlineStepDetector": "online", "LiveSession": "live",
+    "calc_rei": "metrics", "calc_gss": "metrics", "calc_cad_asym": "metrics",
+    "cad_over_time": "metrics", "calc_fi": "metrics", "SessionAccumulator": "accum",
+    "DEVICE_POSITIONS": "config", "ALGO": "config",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module 'rba' has no attribute {name!r}")
+    import importlib
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
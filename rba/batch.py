@@ -0,0 +1,104 @@
+"""Análisis por lotes sin interfaz: load_csv → analyze sobre un directorio o glob.
+
+    python -m rba.batch sesiones/ [más/*.csv ...] [--device "Pecho / Arnés"] [--workers 8]
+
+Cada archivo se procesa en un proceso del pool (por defecto uno por núcleo); solo
+vuelve al proceso principal el registro de historial, no las señales. Los
+registros se escriben al historial (los mismos que guarda la app) al terminar y
+los fallos se listan por archivo; el código de salida es 1 si hubo alguno.
+
+No se usa el cache de la app (su tope de disco y el LRU de resultados son de los
+usuarios interactivos): con --cache las sesiones se guardan como .rba en
+BATCH_CACHE_DIR, con su propio tope, y las corridas siguientes no reparsean los CSV.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .config import BATCH_CACHE_DIR, BATCH_CACHE_MB, DEVICE_POSITIONS
+
+
+def find_inputs(patterns):
+    files = []
+    for p in patterns:
+        if os.path.isdir(p):
+            files += sorted(glob.glob(os.path.join(p, "*.csv")))
+        else:
+            files += sorted(glob.glob(p))
+    return list(dict.fromkeys(files))
+
+
+def analyze_file(path, device, athlete=None, cache=False):
+    """Trabajo de un proceso: (path, registro, error, segundos)."""
+    t0 = time.perf_counter()
+    try:
+        from .history import session_record
+        from .pipeline import StageTimer, analyze
+        timer = StageTimer()
+        with timer.stage("load"):
+            if cache:
+                from .cache import load_session
+                df = load_session(path, root=BATCH_CACHE_DIR, max_mb=BATCH_CACHE_MB)
+            else:
+                from .ingest import load_csv
+                df = load_csv(path)
+        r = analyze(df, None, device, timer, workers=1)   # ya hay un proceso por archivo
+        r["timings"] = timer.stages
+        rec = dict(session_record(r, athlete), file=os.path.basename(path))
+        return path, rec, None, time.perf_counter() - t0
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}", time.perf_counter() - t0
+
+
+def run(files, device, workers=None, progress=True, athlete=None, cache=False):
+    """Devuelve (registros en el orden de files, {path: error})."""
+    workers = workers or os.cpu_count() or 1
+    records, failures = {}, {}
+    done = 0
+    with ProcessPoolExecutor(max_workers=min(workers, len(files))) as ex:
+        futs = [ex.submit(analyze_file, f, device, athlete, cache) for f in files]
+        for fut in as_completed(futs):
+            path, rec, err, secs = fut.result()
+            done += 1
+            if err: failures[path] = err
+            else: records[path] = rec
+            if progress:
+                status = f"✗ {err}" if err else f"REI {rec['rei']:>5.1f}  {rec['cadence']:>5.1f} ppm"
+                print(f"[{done:>{len(str(len(files)))}}/{len(files)}] {os.path.basename(path):<40} "
+                      f"{secs:6.1f} s  {status}", file=sys.stderr)
+    return [records[f] for f in files if f in records], failures
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m rba.batch", description=__doc__.split("\n")[0])
+    ap.add_argument("inputs", nargs="+", help="directorios (se toman sus *.csv) o globs")
+    ap.add_argument("--device", default="Espalda / Canguro", choices=list(DEVICE_POSITIONS))
+    ap.add_argument("--athlete", default=None, help="atleta al que se asignan las sesiones")
+    ap.add_argument("--workers", type=int, default=None, help="procesos (por defecto, núcleos)")
+    ap.add_argument("--no-history", action="store_true", help="no escribir al historial")
+    ap.add_argument("--cache", action="store_true",
+                    help=f"guardar las sesiones como .rba en {BATCH_CACHE_DIR} (aparte del cache de la app)")
+    a = ap.parse_args(argv)
+
+    files = find_inputs(a.inputs)
+    if not files:
+        print("sin archivos CSV", file=sys.stderr)
+        return 1
+    t0 = time.perf_counter()
+    records, failures = run(files, a.device, a.workers, athlete=a.athlete, cache=a.cache)
+    if records and not a.no_history:
+        from .history import extend_history
+        extend_history(records)
+    secs = time.perf_counter() - t0
+    print(f"\n{len(records)}/{len(files)} sesiones analizadas en {secs:.1f} s "
+          f"({len(files)/secs:.1f} archivos/s)", file=sys.stderr)
+    for path, err in failures.items():
+        print(f"  ✗ {path}: {err}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
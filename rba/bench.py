@@ -0,0 +1,150 @@
+"""Benchmark reproducible del motor de análisis (no depende de Streamlit).
+
+    python -m rba.bench run [--quick] [--repeat 3] [--out bench.json]
+    python -m rba.bench compare baseline.json bench.json [--tolerance 0.15]
+
+Genera sesiones sintéticas con demo_data sobre una grilla de duraciones y
+frecuencias de muestreo. Cada etapa se cronometra sin instrumentación (mediana de
+--repeat pasadas) y la memoria pico se mide en una pasada aparte con tracemalloc.
+compare marca como regresión toda etapa más lenta (o con más memoria) que la
+línea base por encima de la tolerancia, y sale con código 1.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+from . import profiling
+from .dsp import preprocess, detect_steps
+from .metrics import calc_rei, calc_cad_asym, cad_over_time, calc_fi
+from .pipeline import analyze, demo_data
+
+DURATIONS = [600, 3600, 3 * 3600, 6 * 3600]     # 10 min … 6 h
+RATES     = [50, 100, 200, 500]
+QUICK_DURATIONS = [600, 3600]
+QUICK_RATES     = [50, 100]
+DEVICE    = "Espalda / Canguro"
+MIN_MS    = 1.0     # diferencias menores no cuentan como regresión (ruido)
+
+
+def _timed(times, name, fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    times[name] = time.perf_counter() - t0
+    return out
+
+
+def _pass(accel, gps):
+    """Una pasada del pipeline etapa por etapa, más analyze() completo."""
+    t = {}
+    acc = _timed(t, "preprocess", preprocess, accel)
+    _, pt, pv = _timed(t, "detect_steps", detect_steps, acc)
+    _timed(t, "calc_rei", calc_rei, acc, pv)
+    _timed(t, "calc_cad_asym", calc_cad_asym, pt)
+    _timed(t, "cad_over_time", cad_over_time, pt)
+    _timed(t, "calc_fi", calc_fi, acc, pt, pv)
+    _timed(t, "analyze", lambda: analyze(accel, gps, DEVICE, workers=1))   # en serie: no depende de los núcleos
+    return t
+
+
+def run_case(dur, fs, repeat):
+    accel, gps = demo_data(dur, fs)
+    profiling.enable(False)
+    runs = [_pass(accel, gps) for _ in range(repeat)]
+    profiling.enable(True, memory=True)
+    with profiling.trace(f"{dur}s-{fs}Hz") as tr:
+        _pass(accel, gps)
+    profiling.enable(False)
+    peaks = {}
+    for e in tr.events:
+        kb = e["args"].get("peak_kb", 0)
+        peaks[e["name"]] = max(peaks.get(e["name"], 0), kb)
+    out = []
+    for stage in runs[0]:
+        ws = [r[stage] * 1000 for r in runs]
+        out.append({"duration_s": dur, "fs": fs, "samples": len(accel), "stage": stage,
+                    "wall_ms": round(statistics.median(ws), 2),
+                    "wall_ms_min": round(min(ws), 2),
+                    "peak_mb": round(peaks.get(stage, 0) / 1024, 2)})
+    del accel, gps, runs
+    gc.collect()
+    return out
+
+
+def _meta():
+    import pandas, scipy
+    return {"python": platform.python_version(), "numpy": np.__version__,
+            "scipy": scipy.__version__, "pandas": pandas.__version__,
+            "platform": platform.platform(), "cpus": os.cpu_count(),
+            "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+
+
+def run(durations, rates, repeat, out):
+    results = []
+    for dur in durations:
+        for fs in rates:
+            t0 = time.perf_counter()
+            results += run_case(dur, fs, repeat)
+            print(f"  {dur/60:>5.0f} min @ {fs:>3} Hz  ({time.perf_counter()-t0:.1f} s)",
+                  file=sys.stderr)
+    doc = {"meta": _meta(), "repeat": repeat, "results": results}
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    return doc
+
+
+def compare(baseline, current, tol=0.15):
+    """Lista de (caso, métrica, base, actual, ratio, es_regresión) por etapa común."""
+    base = {(r["duration_s"], r["fs"], r["stage"]): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        b = base.get((r["duration_s"], r["fs"], r["stage"]))
+        if b is None: continue
+        case = f"{r['duration_s']/60:.0f}min@{r['fs']}Hz {r['stage']}"
+        for key, floor in (("wall_ms", MIN_MS), ("peak_mb", 0.5)):
+            bv, cv = b.get(key) or 0, r.get(key) or 0
+            ratio = cv / bv if bv else 1.0
+            rows.append((case, key, bv, cv, ratio, ratio > 1 + tol and cv - bv > floor))
+    return rows
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m rba.bench", description=__doc__.split("\n")[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("run", help="ejecuta la grilla y escribe resultados JSON")
+    rp.add_argument("--quick", action="store_true", help="grilla reducida (10-60 min, 50-100 Hz)")
+    rp.add_argument("--durations", type=int, nargs="+", help="duraciones en segundos")
+    rp.add_argument("--rates", type=int, nargs="+", help="frecuencias de muestreo en Hz")
+    rp.add_argument("--repeat", type=int, default=3)
+    rp.add_argument("--out", default="bench.json")
+    cp = sub.add_parser("compare", help="compara contra una línea base")
+    cp.add_argument("baseline")
+    cp.add_argument("current")
+    cp.add_argument("--tolerance", type=float, default=0.15)
+    a = ap.parse_args(argv)
+
+    if a.cmd == "run":
+        durs = a.durations or (QUICK_DURATIONS if a.quick else DURATIONS)
+        rates = a.rates or (QUICK_RATES if a.quick else RATES)
+        run(durs, rates, a.repeat, a.out)
+        print(f"resultados en {a.out}", file=sys.stderr)
+        return 0
+
+    with open(a.baseline) as f: baseline = json.load(f)
+    with open(a.current) as f: current = json.load(f)
+    rows = compare(baseline, current, a.tolerance)
+    bad = [r for r in rows if r[5]]
+    for case, key, bv, cv, ratio, reg in rows:
+        print(f"{'✗' if reg else ' '} {case:<36}{key:>8}{bv:>11.2f}{cv:>11.2f}{ratio:>7.2f}x")
+    print(f"\n{len(bad)} regresiones (tolerancia {a.tolerance:.0%})")
+    return 1 if bad else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
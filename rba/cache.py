@@ -0,0 +1,210 @@
+"""Caches: sesiones normalizadas en disco (store.py, mapeadas) y resultados de análisis (LRU)."""
+import datetime
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from .config import (ALGO, CACHE_COLS, CACHE_DIR, CACHE_MAX_MB, CACHE_VERSION,
+                     FIG_CACHE_SIZE, RESULT_CACHE_MB, RESULT_CACHE_SIZE, RESULT_DISK_DIR,
+                     RESULT_DISK_MB)
+from .ingest import load_csv
+from .metrics import cad_over_time
+from .pipeline import StageTimer, analyze, demo_data
+from .store import SignalStore, write as store_write
+
+
+# ─────────────────────────────────────────────
+# SESIONES (un archivo .rba por sesión, ver store.py)
+# ─────────────────────────────────────────────
+def file_digest(f):
+    h=hashlib.blake2b(digest_size=16)
+    if isinstance(f,(str,os.PathLike)):
+        with open(f,'rb') as fh:
+            for b in iter(lambda: fh.read(1<<20), b''): h.update(b)
+        return h.hexdigest()
+    f.seek(0)
+    for b in iter(lambda: f.read(1<<20), b''): h.update(b)
+    f.seek(0); return h.hexdigest()
+
+def session_key(f):
+    return f"v{CACHE_VERSION}-{file_digest(f)}"
+
+def _evict_lru(root, max_bytes):
+    """Borra las entradas menos usadas (mtime más antiguo) hasta quedar bajo max_bytes."""
+    entries=[]
+    for name in os.listdir(root):
+        p=os.path.join(root,name)
+        if name.startswith('.'): continue
+        if os.path.isdir(p):
+            size=sum(os.path.getsize(os.path.join(p,c)) for c in os.listdir(p))
+        else:
+            size=os.path.getsize(p)
+        entries.append((os.path.getmtime(p),size,p))
+    total=sum(e[1] for e in entries)
+    for _,size,p in sorted(entries):
+        if total<=max_bytes: break
+        if os.path.isdir(p): shutil.rmtree(p,ignore_errors=True)
+        else: os.remove(p)
+        total-=size
+
+def _session_path(key, root=CACHE_DIR): return os.path.join(root,"sessions",key+".rba")
+
+def cache_get(key, root=CACHE_DIR):
+    """SignalStore de la sesión (mapeada, sin leerla) o None."""
+    p=_session_path(key,root)
+    if not os.path.exists(p): return None
+    s=SignalStore(p)
+    os.utime(p)   # marca de uso para el LRU
+    return s
+
+def cache_put(key, df, root=CACHE_DIR, max_mb=CACHE_MAX_MB):
+    d=os.path.join(root,"sessions"); os.makedirs(d,exist_ok=True)
+    store_write(_session_path(key,root),df)
+    _evict_lru(d,max_mb*1024*1024)
+
+def _compact(df):
+    import pandas as pd
+    return pd.DataFrame({c:df[c].to_numpy(dtype='float64' if c=='time' else 'float32')
+                         for c in CACHE_COLS if c in df.columns})
+
+def load_session(f, key=None, root=CACHE_DIR, max_mb=CACHE_MAX_MB):
+    """load_csv con cache en disco por hash de contenido. Devuelve el SignalStore
+    recién escrito (la sesión se lee una vez y queda mapeada) o, si no se pudo
+    escribir, el DataFrame compacto. root/max_mb: otro cache con su propio tope
+    (el de rba.batch no desaloja las sesiones de la app)."""
+    key=key or session_key(f)
+    try:
+        s=cache_get(key,root)
+        if s is not None: return s
+    except (OSError,ValueError):
+        pass
+    df=_compact(load_csv(f))
+    try:
+        cache_put(key,df,root,max_mb); return cache_get(key,root) or df
+    except (OSError,ValueError):
+        return df
+
+# ─────────────────────────────────────────────
+# RESULTADOS
+# ─────────────────────────────────────────────
+def cache_key(*parts):
+    return hashlib.blake2b(repr(parts).encode(),digest_size=16).hexdigest()
+
+def nbytes(v):
+    """Tamaño aproximado en memoria de arrays, DataFrames y dicts/listas de ellos."""
+    if isinstance(v,np.ndarray): return v.nbytes
+    if hasattr(v,"memory_usage"): return int(v.memory_usage(index=True).sum())
+    if isinstance(v,(bytes,bytearray)): return len(v)
+    if isinstance(v,dict): return sum(nbytes(x) for x in v.values())
+    if isinstance(v,(list,tuple)): return sum(nbytes(x) for x in v)
+    return 8
+
+class LRUCache:
+    """LRU acotado en memoria (por cantidad y opcionalmente por bytes) con nivel
+    opcional en disco (pickle), seguro entre hilos."""
+    def __init__(self, maxsize, disk_dir=None, disk_mb=256, disk_exclude=(), max_mb=None):
+        self.maxsize=maxsize; self.disk_dir=disk_dir; self.disk_mb=disk_mb
+        self.disk_exclude=disk_exclude    # claves de dicts grandes que no se persisten
+        self.max_bytes=max_mb*1024*1024 if max_mb else None
+        self.hits=self.misses=0; self.bytes=0
+        self._d=OrderedDict(); self._sizes={}; self._lock=threading.Lock()
+
+    def _path(self, key): return os.path.join(self.disk_dir,key+".pkl")
+
+    def _mem_put(self, key, value):
+        size=nbytes(value) if self.max_bytes else 0
+        with self._lock:
+            self.bytes+=size-self._sizes.get(key,0); self._sizes[key]=size
+            self._d[key]=value; self._d.move_to_end(key)
+            while len(self._d)>self.maxsize or (self.max_bytes and self.bytes>self.max_bytes and len(self._d)>1):
+                k,_=self._d.popitem(last=False); self.bytes-=self._sizes.pop(k)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._d:
+                self._d.move_to_end(key); self.hits+=1
+                return self._d[key]
+        if self.disk_dir:
+            try:
+                with open(self._path(key),'rb') as f: value=pickle.load(f)
+                os.utime(self._path(key))
+                self._mem_put(key,value); self.hits+=1
+                return value
+            except (OSError,EOFError,pickle.UnpicklingError):
+                pass
+        self.misses+=1; return None
+
+    def put(self, key, value):
+        self._mem_put(key,value)
+        if not self.disk_dir: return
+        if isinstance(value,dict) and self.disk_exclude:
+            value={k:v for k,v in value.items() if k not in self.disk_exclude}
+        try:
+            os.makedirs(self.disk_dir,exist_ok=True)
+            fd,tmp=tempfile.mkstemp(dir=self.disk_dir,prefix=".tmp-")
+            with os.fdopen(fd,'wb') as f: pickle.dump(value,f,protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp,self._path(key))
+            _evict_lru(self.disk_dir,self.disk_mb*1024*1024)
+        except (OSError,pickle.PicklingError):
+            pass
+
+    def memo(self, key, fn, *args, **kw):
+        value=self.get(key)
+        if value is None:
+            value=fn(*args,**kw); self.put(key,value)
+        return value
+
+
+# Una sola instancia por proceso: sobreviven a los reruns de Streamlit y se comparten entre usuarios
+results = LRUCache(RESULT_CACHE_SIZE, RESULT_DISK_DIR, RESULT_DISK_MB, disk_exclude=("accel",),
+                   max_mb=RESULT_CACHE_MB)
+derived = LRUCache(FIG_CACHE_SIZE)   # series derivadas y figuras
+
+SIGNAL_KEYS = ("accel","gps","pt","pv")   # lo pesado de un resultado; el resto es el resumen
+
+def cached_analyze(accel_key, gps_key, dev_name, load, timer=None):
+    """analyze() memoizado por (contenido, dispositivo, parámetros); load() solo se llama en un miss."""
+    timer=timer or StageTimer()
+    rid=cache_key("analysis",accel_key,gps_key,dev_name,sorted(ALGO.items()))
+    with timer.stage("cache"):
+        r=results.get(rid)
+    if r is None:
+        with timer.stage("load"):
+            adf,gdf=load()
+        if adf is None: return None
+        r=analyze(adf,gdf,dev_name,timer); r["id"]=rid
+        results.put(rid,r)
+    return dict(r,date=datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+                timings=timer.stages,inputs=(accel_key,gps_key,dev_name))
+
+def summary(r):
+    """Resultado sin señales: lo que se guarda por usuario en session_state."""
+    return {k:v for k,v in r.items() if k not in SIGNAL_KEYS}
+
+def _reload(key):
+    if key is None: return None
+    df=cache_get(key)
+    if df is None: raise LookupError("los datos de la sesión ya no están en cache; vuelve a subir el archivo")
+    return df
+
+def full_result(s):
+    """Resultado completo de un resumen: del cache de resultados o, si fue
+    desalojado, recalculado desde el cache de sesiones."""
+    if any(k in s for k in SIGNAL_KEYS[1:]): return s
+    r=results.get(s["id"])
+    if r is None:
+        akey,gkey,dev=s["inputs"]
+        load=demo_data if akey=="demo" else (lambda: (_reload(akey),_reload(gkey)))
+        r=cached_analyze(akey,gkey,dev,load)
+    return dict(r,**s)
+
+def cached_cad(r):
+    if "id" not in r: return cad_over_time(r["pt"])
+    return derived.memo(cache_key("cad",r["id"],ALGO["cad_window"]),
+                        lambda: cad_over_time(full_result(r)["pt"]))
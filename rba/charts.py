@@ -0,0 +1,539 @@
+"""Gráficos de resultados: Plotly interactivo y dashboard matplotlib exportable.
+
+Las figuras reciben la paleta del tema (THEMES) como argumento; plotly y
+matplotlib se importan solo al dibujar.
+"""
+import io
+
+import numpy as np
+
+from .config import CHART_PTS_PER_PX, CHART_WIDTH_PX
+from .metrics import cad_over_time
+from .profiling import profiled
+
+THEMES = {
+    "dark": {
+        "BG":       "#060608",
+        "BG2":      "#0d0d10",
+        "CARD":     "#111116",
+        "BORDER":   "#1e1e28",
+        "BORDER2":  "#2a2a38",
+        "TEXT":     "#f0f0f5",
+        "SUBTEXT":  "#5a5a72",
+        "ACCENT":   "#C8FF00",   # lima eléctrico
+        "ACCENT2":  "#00E5FF",   # cyan
+        "GOOD":     "#39D98A",
+        "WARN":     "#FFCB47",
+        "BAD":      "#FF5C5C",
+        "CHART_BG": "#0d0d10",
+        "SHADOW":   "rgba(200,255,0,0.08)",
+    },
+    "light": {
+        "BG":       "#F5F5F0",
+        "BG2":      "#EBEBЕ4",
+        "CARD":     "#FFFFFF",
+        "BORDER":   "#E0E0D8",
+        "BORDER2":  "#CCCCС0",
+        "TEXT":     "#111116",
+        "SUBTEXT":  "#888880",
+        "ACCENT":   "#5C8A00",
+        "ACCENT2":  "#0077AA",
+        "GOOD":     "#1A8A55",
+        "WARN":     "#B8880A",
+        "BAD":      "#CC2222",
+        "CHART_BG": "#FFFFFF",
+        "SHADOW":   "rgba(92,138,0,0.10)",
+    },
+}
+
+
+def _colors(pal):
+    return tuple(pal[k] for k in ("BG","CARD","BORDER","TEXT","SUBTEXT","ACCENT","ACCENT2",
+                                  "GOOD","WARN","BAD","CHART_BG"))
+
+def _mpl():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import matplotlib.gridspec as gridspec
+    from matplotlib.lines import Line2D
+    from matplotlib.patches import Rectangle
+    return plt, gridspec, Line2D, Rectangle
+
+def scolor(val, good, warn, invert=False, pal=None):
+    pal=pal or THEMES["dark"]
+    GOOD,WARN,BAD=pal["GOOD"],pal["WARN"],pal["BAD"]
+    lo_g, hi_g = good; lo_w, hi_w = warn
+    if not invert:
+        if lo_g <= val <= hi_g: return GOOD
+        if lo_w <= val <= hi_w: return WARN
+        return BAD
+    else:
+        if val <= hi_g: return GOOD
+        if val <= hi_w: return WARN
+        return BAD
+
+# ─────────────────────────────────────────────
+#  DIEZMADO (nivel de detalle)
+# ─────────────────────────────────────────────
+def max_points(width_px, panels=1):
+    """Tope de puntos por traza para un panel de width_px/panels píxeles."""
+    return max(16, int(width_px/panels*CHART_PTS_PER_PX))
+
+def lttb(x, y, n):
+    """Largest-Triangle-Three-Buckets: n puntos (índices) que conservan la forma.
+    El primero y el último se mantienen; en cada bucket queda el punto que forma
+    el triángulo de mayor área con el elegido antes y la media del siguiente."""
+    N=len(x)
+    if n>=N or n<3: return np.arange(N)
+    x=np.asarray(x,dtype=np.float64); y=np.asarray(y,dtype=np.float64)
+    edges=np.linspace(1,N-1,n-1).astype(np.int64)
+    edges=np.append(edges,N)
+    out=np.empty(n,dtype=np.int64); out[0]=0; out[-1]=N-1; a=0
+    for i in range(n-2):
+        lo,hi,nhi=edges[i],edges[i+1],edges[i+2]
+        cx=x[hi:nhi].mean(); cy=y[hi:nhi].mean(); ax,ay=x[a],y[a]
+        area=np.abs((ax-cx)*(y[lo:hi]-ay)-(ax-x[lo:hi])*(cy-ay))
+        a=lo+int(area.argmax()); out[i+1]=a
+    return out
+
+def decimate(x, y, n):
+    """(x, y) reducidos a n puntos como mucho con LTTB; sin copia si ya caben."""
+    x=np.asarray(x); y=np.asarray(y)
+    if len(x)<=n: return x,y
+    i=lttb(x,y,n); return x[i],y[i]
+
+def plotly_live(snap, pal):
+    """Modo en vivo: magnitud de los últimos segundos con las pisadas, cadencia y
+    fatiga de la sesión. snap es LiveSession.snapshot() (series ya acotadas)."""
+    BG,CARD,BORDER,TEXT,SUBTEXT,ACCENT,ACCENT2,GOOD,WARN,BAD,CHART_BG=_colors(pal)
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        P = CHART_BG; G = BORDER; T = SUBTEXT
+        fig = make_subplots(rows=1, cols=3, column_widths=[0.5,0.25,0.25],
+                            subplot_titles=["SEÑAL (|a|)", "CADENCIA", "FATIGUE INDEX"],
+                            horizontal_spacing=0.06)
+        fig.add_trace(go.Scatter(
+            x=snap["signal_t"], y=snap["signal_mag"], mode='lines',
+            line=dict(color=ACCENT, width=1.2), hoverinfo='skip'), row=1, col=1)
+        if snap["steps_t"]:
+            mag = np.interp(snap["steps_t"], snap["signal_t"], snap["signal_mag"])
+            fig.add_trace(go.Scatter(
+                x=snap["steps_t"], y=mag, mode='markers',
+                marker=dict(size=7, color=WARN, symbol='triangle-down'),
+                hovertemplate="<b>%{x:.2f} s</b><extra></extra>"), row=1, col=1)
+        if snap["cad_t"]:
+            fig.add_trace(go.Scatter(
+                x=snap["cad_t"], y=snap["cad_v"], mode='lines',
+                line=dict(color=scolor(snap["cadence"],(170,185),(160,195),pal=pal), width=2.5),
+                hovertemplate="<b>%{y:.0f} ppm</b><br>%{x:.1f} min<extra></extra>"), row=1, col=2)
+        if snap["fi_t"]:
+            fig.add_trace(go.Scatter(
+                x=snap["fi_t"], y=snap["fi_v"], mode='lines+markers',
+                line=dict(color=WARN, width=2), marker=dict(size=5, color=P, line=dict(color=WARN, width=2)),
+                hovertemplate="<b>%{y:.3f}</b><br>%{x:.0f} min<extra></extra>"), row=1, col=3)
+        fig.update_layout(paper_bgcolor=P, plot_bgcolor=P, showlegend=False, height=260,
+                          font=dict(family="Space Grotesk, sans-serif", color=T, size=11),
+                          margin=dict(l=10, r=10, t=40, b=30), uirevision="live")
+        for i,unit in enumerate(["s","min","min"], 1):
+            fig.update_xaxes(showgrid=True, gridcolor=G, gridwidth=0.5, zeroline=False,
+                             tickfont=dict(size=9, color=T), title_text=unit,
+                             title_font=dict(size=9, color=T), linecolor=G, row=1, col=i)
+            fig.update_yaxes(showgrid=True, gridcolor=G, gridwidth=0.5, zeroline=False,
+                             tickfont=dict(size=9, color=T), linecolor=G, row=1, col=i)
+        for ann in fig.layout.annotations:
+            ann.font = dict(color=ACCENT, size=10, family="Space Grotesk")
+        return fig
+    except ImportError:
+        return None
+
+def plotly_radar(r, pal):
+    """Figura separada solo para el radar chart."""
+    BG,CARD,BORDER,TEXT,SUBTEXT,ACCENT,ACCENT2,GOOD,WARN,BAD,CHART_BG=_colors(pal)
+    try:
+        import plotly.graph_objects as go
+        P = CHART_BG; G = BORDER; T = SUBTEXT
+        rei=r["rei"]; cad=r["cadence"]; gss=r["gss"]; asym=r["asymmetry"]
+
+        radar_cats = ["ECONOMY", "CADENCIA", "IMPACTO", "SIMETRÍA", "VELOCIDAD"]
+        radar_vals = [
+            float(rei),
+            float(np.clip((cad-120)/80*100, 0, 100)),
+            float(np.clip((1 - gss/20)*100, 0, 100)),
+            float(np.clip((1 - asym/20)*100, 0, 100)),
+            float(np.clip(r["speed"]/5*100, 0, 100)),
+        ]
+        rv = radar_vals + [radar_vals[0]]
+        rc = radar_cats + [radar_cats[0]]
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatterpolar(
+            r=[100]*6, theta=rc, fill='toself',
+            fillcolor="rgba(255,255,255,0.02)",
+            line=dict(color=G, width=1), showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatterpolar(
+            r=[80]*6, theta=rc, fill='toself',
+            fillcolor="rgba(200,255,0,0.04)",
+            line=dict(color=ACCENT, width=0.8, dash='dot'),
+            showlegend=False, hoverinfo='skip'
+        ))
+        fig.add_trace(go.Scatterpolar(
+            r=rv, theta=rc, fill='toself',
+            fillcolor="rgba(200,255,0,0.15)",
+            line=dict(color=ACCENT, width=2.5),
+            marker=dict(size=7, color=ACCENT, line=dict(color=P, width=1.5)),
+            showlegend=False,
+            hovertemplate="<b>%{theta}</b><br>%{r:.0f}/100<extra></extra>"
+        ))
+        fig.update_layout(
+            paper_bgcolor=P, font=dict(family="Space Grotesk, sans-serif", color=T, size=11),
+            height=300, margin=dict(l=20, r=20, t=40, b=20),
+            title=dict(text="PERFORMANCE RADAR", font=dict(color=ACCENT, size=10,
+                       family="Space Grotesk"), x=0.5),
+            polar=dict(
+                bgcolor=P,
+                radialaxis=dict(visible=True, range=[0,100], showticklabels=False,
+                                showline=False, gridcolor=G, gridwidth=0.8),
+                angularaxis=dict(tickfont=dict(size=9, color=T, family="Space Grotesk"),
+                                 linecolor=G, gridcolor=G),
+            )
+        )
+        return fig
+    except Exception:
+        return None
+
+
+@profiled
+def plotly_charts(r, pal, cad_series=None, width_px=CHART_WIDTH_PX):
+    """3 gráficas XY: cadencia, fatigue, velocidad. Cada serie se diezma según el
+    ancho de su panel, así el JSON enviado no crece con la duración."""
+    BG,CARD,BORDER,TEXT,SUBTEXT,ACCENT,ACCENT2,GOOD,WARN,BAD,CHART_BG=_colors(pal)
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        pt=r["pt"]; pv=r["pv"]
+        ft=r["fi_times"]; fv=r["fi_values"]
+        cad=r["cadence"]; gps=r["gps"]
+        t_cad, cad_v = cad_series if cad_series is not None else cad_over_time(pt)
+        npts = max_points(width_px, 3)
+
+        P = CHART_BG; G = BORDER; T = SUBTEXT
+        FONT = dict(family="Space Grotesk, sans-serif", color=T, size=11)
+        cc = scolor(cad,(170,185),(160,195),pal=pal)
+
+        fig = make_subplots(
+            rows=1, cols=3,
+            subplot_titles=["CADENCIA EN EL TIEMPO", "FATIGUE INDEX", "VELOCIDAD GPS"],
+            horizontal_spacing=0.07
+        )
+
+        # ── Cadencia ──
+        if len(t_cad) > 2:
+            x_range = [float(t_cad[0]/60), float(t_cad[-1]/60)]
+            # Zona optima como banda
+            fig.add_trace(go.Scatter(
+                x=x_range + x_range[::-1], y=[185,185,170,170],
+                fill='toself', fillcolor="rgba(57,217,138,0.08)",
+                line=dict(width=0), showlegend=False, hoverinfo='skip'
+            ), row=1, col=1)
+            # Linea promedio
+            fig.add_trace(go.Scatter(
+                x=x_range, y=[float(cad), float(cad)],
+                mode='lines', line=dict(color=ACCENT, dash='dot', width=1.2),
+                showlegend=False, hoverinfo='skip'
+            ), row=1, col=1)
+            # Cadencia principal
+            xc, yc = decimate(t_cad/60, cad_v, npts)
+            fig.add_trace(go.Scatter(
+                x=xc, y=yc, mode='lines',
+                line=dict(color=cc, width=2.5, shape='spline'),
+                fill='tozeroy', fillcolor="rgba(57,217,138,0.06)",
+                hovertemplate="<b>%{y:.0f} ppm</b><br>%{x:.1f} min<extra></extra>"
+            ), row=1, col=1)
+
+        # ── Fatigue ──
+        if ft and fv:
+            fi_arr=np.array(fv); fi_t=np.array(ft)
+            sl=np.polyfit(fi_t,fi_arr,1)
+            tc=WARN if sl[0]>0.0001 else (GOOD if sl[0]<-0.0001 else ACCENT)
+            trend=np.poly1d(sl)(fi_t)[[0,-1]]
+            xf, yf = decimate(fi_t, fi_arr, npts)
+            fig.add_trace(go.Scatter(
+                x=xf, y=yf, mode='lines+markers' if len(xf) <= 120 else 'lines',
+                line=dict(color=tc, width=2.5, shape='spline'),
+                marker=dict(size=6, color=P, line=dict(color=tc, width=2)),
+                fill='tozeroy', fillcolor="rgba(255,203,71,0.06)",
+                hovertemplate="<b>%{y:.3f}</b><br>%{x:.1f} min<extra></extra>"
+            ), row=1, col=2)
+            fig.add_trace(go.Scatter(
+                x=fi_t[[0,-1]], y=trend, mode='lines',
+                line=dict(color=ACCENT, dash='dash', width=1.5),
+                showlegend=False,
+                hovertemplate="tendencia: %{y:.3f}<extra></extra>"
+            ), row=1, col=2)
+
+        # ── Velocidad ──
+        if gps is not None and 'speed' in gps.columns:
+            tg=gps['time'].values/60; sp=gps['speed'].values
+            xs, ys = decimate(tg, sp, npts)
+            fig.add_trace(go.Scatter(
+                x=xs, y=ys, mode='lines',
+                line=dict(color=ACCENT, width=2.5, shape='spline'),
+                fill='tozeroy', fillcolor="rgba(200,255,0,0.07)",
+                hovertemplate="<b>%{y:.2f} m/s</b><br>%{x:.1f} min<extra></extra>"
+            ), row=1, col=3)
+            avg_sp = float(np.mean(sp))
+            fig.add_trace(go.Scatter(
+                x=[float(tg[0]), float(tg[-1])], y=[avg_sp, avg_sp],
+                mode='lines', line=dict(color=T, dash='dot', width=1),
+                showlegend=False, hoverinfo='skip'
+            ), row=1, col=3)
+        elif len(pv) > 4:
+            imp=np.abs(pv)
+            counts,bins=np.histogram(imp,bins=40)
+            fig.add_trace(go.Bar(
+                x=(bins[:-1]+bins[1:])/2, y=counts,
+                marker_color=ACCENT, opacity=0.6,
+                hovertemplate="<b>%{x:.1f} m/s²</b><br>%{y} pasos<extra></extra>"
+            ), row=1, col=3)
+
+        fig.update_layout(
+            paper_bgcolor=P, plot_bgcolor=P, font=FONT,
+            showlegend=False, height=300,
+            margin=dict(l=10, r=10, t=40, b=30),
+        )
+        for i in range(1,4):
+            fig.update_xaxes(showgrid=True, gridcolor=G, gridwidth=0.5,
+                             zeroline=False, tickfont=dict(size=9, color=T),
+                             title_text="min", title_font=dict(size=9, color=T),
+                             linecolor=G, row=1, col=i)
+            fig.update_yaxes(showgrid=True, gridcolor=G, gridwidth=0.5,
+                             zeroline=False, tickfont=dict(size=9, color=T),
+                             linecolor=G, row=1, col=i)
+        for ann in fig.layout.annotations:
+            ann.font = dict(color=ACCENT, size=10, family="Space Grotesk")
+        return fig
+    except ImportError:
+        return None
+
+def plotly_comparison(history, n, pal):
+    BG,CARD,BORDER,TEXT,SUBTEXT,ACCENT,ACCENT2,GOOD,WARN,BAD,CHART_BG=_colors(pal)
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+        h=history[-n:]
+        labels=[s["date"][5:16] for s in h]
+        x=list(range(len(labels)))
+        metrics=[
+            ("REI",      [s["rei"]       for s in h], GOOD,  "/100"),
+            ("GROUND SHOCK",[s["gss"]    for s in h], BAD,   "m/s²"),
+            ("CADENCIA", [s["cadence"]   for s in h], ACCENT,"ppm"),
+            ("ASIMETRÍA",[s["asymmetry"] for s in h], WARN,  "%"),
+        ]
+        fig=make_subplots(rows=2,cols=2,
+                          subplot_titles=[m[0] for m in metrics],
+                          horizontal_spacing=0.08, vertical_spacing=0.14)
+        positions=[(1,1),(1,2),(2,1),(2,2)]
+        for (row,col),(title,vals,color,unit) in zip(positions,metrics):
+            fig.add_trace(go.Bar(
+                x=labels, y=vals, marker_color=color,
+                opacity=0.3, showlegend=False,
+                hovertemplate=f"%{{y}}{unit}<extra></extra>"
+            ), row=row, col=col)
+            fig.add_trace(go.Scatter(
+                x=labels, y=vals, mode='lines+markers',
+                line=dict(color=color, width=2.5),
+                marker=dict(size=7, color=CHART_BG, line=dict(color=color,width=2)),
+                showlegend=False,
+                hovertemplate=f"%{{y}}{unit}<extra></extra>"
+            ), row=row, col=col)
+            if len(vals)>=2:
+                tr=np.poly1d(np.polyfit(x,vals,1))(x)
+                fig.add_trace(go.Scatter(
+                    x=labels, y=tr, mode='lines',
+                    line=dict(color=TEXT, dash='dot', width=1), opacity=0.3,
+                    showlegend=False
+                ), row=row, col=col)
+        fig.update_layout(
+            paper_bgcolor=CHART_BG, plot_bgcolor=CHART_BG,
+            font=dict(family="Space Grotesk", color=SUBTEXT, size=11),
+            height=500, margin=dict(l=10,r=10,t=50,b=20)
+        )
+        for ann in fig.layout.annotations:
+            ann.font.color=ACCENT; ann.font.size=11
+        fig.update_xaxes(showgrid=False, tickfont=dict(size=8, color=SUBTEXT),
+                         tickangle=-30)
+        fig.update_yaxes(showgrid=True, gridcolor=BORDER, gridwidth=0.5,
+                         zeroline=False, tickfont=dict(size=8, color=SUBTEXT))
+        return fig
+    except ImportError:
+        return None
+
+@profiled
+def build_fig(r, pal, cad_series=None):
+    plt, gridspec, Line2D, Rectangle = _mpl()
+    BG,CARD,BORDER,TEXT,SUBTEXT,ACCENT,ACCENT2,GOOD,WARN,BAD,CHART_BG=_colors(pal)
+    pt=r["pt"]; pv=r["pv"]; rei=r["rei"]; gss=r["gss"]
+    cad=r["cadence"]; asym=r["asymmetry"]
+    ft=r["fi_times"]; fv=r["fi_values"]
+    spd=r["speed"]; dur=r["dur"]
+    gss_g=r["gss_good"]; gss_w=r["gss_warn"]
+    gps=r["gps"]; date_str=r["date"]
+
+    rc=scolor(rei,(65,100),(40,65),pal=pal)
+    gc=scolor(gss,gss_g,gss_w,invert=True,pal=pal)
+    cc=scolor(cad,(170,185),(160,195),pal=pal)
+    ac=scolor(asym,(0,5),(5,10),invert=True,pal=pal)
+
+    fi_arr=np.array(fv) if fv else np.array([])
+    fi_t  =np.array(ft) if ft else np.array([])
+    if len(fi_arr)>1:
+        slope=np.polyfit(fi_t,fi_arr,1)[0]
+        ftc=WARN if slope>0.0001 else (GOOD if slope<-0.0001 else ACCENT)
+        fvs=f"{fi_arr[-1]:.2f}"; fsym="▲" if slope>0.0001 else ("▼" if slope<-0.0001 else "—")
+    else:
+        ftc=SUBTEXT; fvs="N/A"; fsym="—"
+
+    plt.rcParams.update({'font.family':'monospace','figure.facecolor':BG,'axes.facecolor':BG})
+    fig=plt.figure(figsize=(20,11),facecolor=BG)
+    gs=gridspec.GridSpec(3,1,figure=fig,height_ratios=[0.09,0.44,0.44],
+                         hspace=0.08,left=0.03,right=0.97,top=0.96,bottom=0.04)
+    gsc=gridspec.GridSpecFromSubplotSpec(1,6,subplot_spec=gs[1],wspace=0.025)
+
+    def dcard(ax,label,vstr,unit,color,sub='',bf=None):
+        ax.set_facecolor(CARD)
+        for sp in ax.spines.values(): sp.set_edgecolor(BORDER); sp.set_linewidth(0.5)
+        ax.axis('off'); ax.set_xlim(0,1); ax.set_ylim(0,1)
+        ax.add_patch(Rectangle((0,0.945),1,0.055,color=color,alpha=0.9,
+                               transform=ax.transAxes,clip_on=False,zorder=5))
+        ax.text(0.5,0.82,label,ha='center',va='center',color=SUBTEXT,
+                fontsize=7.5,fontfamily='monospace',transform=ax.transAxes)
+        ax.text(0.5,0.50,vstr,ha='center',va='center',color=color,
+                fontsize=28,fontweight='bold',fontfamily='monospace',
+                transform=ax.transAxes)
+        ax.text(0.5,0.24,unit,ha='center',va='center',color=SUBTEXT,
+                fontsize=8.5,fontfamily='monospace',transform=ax.transAxes)
+        if sub:
+            ax.text(0.5,0.09,sub,ha='center',va='center',color=color,
+                    fontsize=7,fontfamily='monospace',transform=ax.transAxes)
+        if bf is not None:
+            bf=float(np.clip(bf,0,1))
+            ax.add_patch(Rectangle((0.06,0.022),0.88,0.04,
+                                   color=BORDER,transform=ax.transAxes,clip_on=False))
+            ax.add_patch(Rectangle((0.06,0.022),0.88*bf,0.04,
+                                   color=color,alpha=0.7,transform=ax.transAxes,clip_on=False))
+
+    # HEADER
+    ax_h=fig.add_subplot(gs[0]); ax_h.axis('off'); ax_h.set_facecolor(BG)
+    ax_h.add_line(Line2D([0,0],[0,1],color=ACCENT,linewidth=3,
+                         transform=ax_h.transAxes,clip_on=False))
+    ax_h.text(0.022,0.62,'RUNNING BIOMECHANICS',ha='left',va='center',
+              color=TEXT,fontsize=18,fontweight='bold',fontfamily='monospace',
+              transform=ax_h.transAxes)
+    ax_h.text(0.022,0.18,f"{date_str}  ·  {r['steps']:,} STEPS  ·  {dur:.1f} MIN",
+              ha='left',va='center',color=SUBTEXT,fontsize=8,fontfamily='monospace',
+              transform=ax_h.transAxes)
+    ax_h.text(0.98,0.55,f"{rei:.0f}",ha='right',va='center',color=rc,
+              fontsize=38,fontweight='bold',fontfamily='monospace',
+              transform=ax_h.transAxes)
+    ax_h.text(0.98,0.12,'REI SCORE',ha='right',va='center',color=SUBTEXT,
+              fontsize=7.5,fontfamily='monospace',transform=ax_h.transAxes)
+    ax_h.add_line(Line2D([0,1],[0,0],color=BORDER,linewidth=0.8,
+                         transform=ax_h.transAxes,clip_on=False))
+
+    # 6 TARJETAS
+    ca=[fig.add_subplot(gsc[i]) for i in range(6)]
+    mp=1000/spd/60 if spd>0 else 0
+    mp_m,mp_s=int(mp),int((mp%1)*60)
+    dcard(ca[0],'RUNNING ECONOMY',f'{rei:.0f}','/100',rc,
+          sub='BUENO' if rc==GOOD else 'MODERADO' if rc==WARN else 'MEJORAR',
+          bf=rei/100)
+    dcard(ca[1],'GROUND SHOCK',f'{gss:.1f}','m/s²',gc,
+          sub='BUENO' if gc==GOOD else 'MODERADO' if gc==WARN else 'ALTO',
+          bf=1-np.clip(gss/20,0,1))
+    dcard(ca[2],'CADENCIA',f'{cad:.0f}','ppm',cc,
+          sub='ÓPTIMA' if cc==GOOD else 'REVISAR',
+          bf=np.clip((cad-120)/100,0,1))
+    dcard(ca[3],'ASIMETRÍA',f'{asym:.1f}','%',ac,
+          sub='OK' if ac==GOOD else 'LEVE' if ac==WARN else 'ALTO',
+          bf=1-np.clip(asym/20,0,1))
+    dcard(ca[4],'VELOCIDAD',f'{spd:.2f}','m/s',ACCENT2,
+          sub=f'{mp_m}m {mp_s:02d}s /km',
+          bf=np.clip(spd/5,0,1))
+    dcard(ca[5],'FATIGUE INDEX',fvs,fsym,ftc,
+          sub='ESTABLE' if fsym=='—' else 'AUMENTANDO' if fsym=='▲' else 'BAJANDO')
+
+    # FILA INFERIOR — 3 mini gráficos matplotlib
+    gsb=gridspec.GridSpecFromSubplotSpec(1,3,subplot_spec=gs[2],wspace=0.04)
+
+    def schart(ax,title,accent):
+        ax.set_facecolor(CARD)
+        for sp in ax.spines.values(): sp.set_edgecolor(BORDER); sp.set_linewidth(0.4)
+        ax.tick_params(labelsize=7,colors=SUBTEXT,length=2)
+        ax.grid(True,color=BORDER,linewidth=0.4,alpha=0.8)
+        ax.add_line(Line2D([0,1],[1,1],color=accent,linewidth=1.5,
+                           transform=ax.transAxes,clip_on=False))
+        ax.text(0.015,0.93,title,transform=ax.transAxes,color=accent,
+                fontsize=8,fontweight='bold',va='top',fontfamily='monospace')
+
+    npts=max_points(fig.get_figwidth()*150, 3)    # 150 dpi como en dashboard_png
+    ax_c=fig.add_subplot(gsb[0])
+    tc,cv=cad_series if cad_series is not None else cad_over_time(pt)
+    tc,cv=decimate(tc,cv,npts)
+    if len(tc)>2:
+        ax_c.fill_between(tc/60,cv,cv.min()-5,alpha=0.08,color=cc)
+        ax_c.plot(tc/60,cv,color=cc,linewidth=1.5,alpha=0.9)
+        ax_c.axhspan(170,185,alpha=0.06,color=GOOD)
+        ax_c.axhline(cad,color=ACCENT,linewidth=0.8,linestyle='--',alpha=0.6)
+        ax_c.set_ylim(max(130,cv.min()-10),min(220,cv.max()+10))
+        ax_c.set_xlabel('min',fontsize=7,color=SUBTEXT)
+    schart(ax_c,'CADENCIA  [ppm]',cc)
+
+    ax_f=fig.add_subplot(gsb[1])
+    if len(fi_arr)>1:
+        ax_f.fill_between(fi_t,fi_arr,fi_arr.min()-.01,alpha=0.10,color=ftc)
+        ax_f.plot(fi_t,fi_arr,color=ftc,linewidth=1.5,marker='o',markersize=4,
+                  markerfacecolor=CARD,markeredgecolor=ftc,markeredgewidth=1.2)
+        ax_f.plot(fi_t,np.poly1d(np.polyfit(fi_t,fi_arr,1))(fi_t),
+                  '--',color=ACCENT,linewidth=0.9,alpha=0.6)
+        ax_f.set_xlabel('min',fontsize=7,color=SUBTEXT)
+    schart(ax_f,'FATIGUE INDEX',ftc)
+
+    ax_s=fig.add_subplot(gsb[2])
+    if gps is not None and 'speed' in gps.columns:
+        tg=gps['time'].values/60; sp=gps['speed'].values
+        sp_mean=np.mean(sp); tg,sp=decimate(tg,sp,npts)
+        ax_s.fill_between(tg,sp,sp.min()*.98,alpha=0.10,color=ACCENT)
+        ax_s.plot(tg,sp,color=ACCENT,linewidth=1.5,alpha=0.9)
+        ax_s.axhline(sp_mean,color=SUBTEXT,linewidth=0.8,linestyle='--',alpha=0.6)
+        ax_s.set_xlabel('min',fontsize=7,color=SUBTEXT)
+        schart(ax_s,'VELOCIDAD  [m/s]',ACCENT)
+    elif len(pv)>4:
+        imp=np.abs(pv)
+        ax_s.hist(imp,bins=35,color=ACCENT,alpha=0.5,edgecolor='none')
+        ax_s.axvline(np.mean(imp),color=TEXT,linewidth=1,linestyle='--',alpha=0.6)
+        ax_s.set_xlabel('m/s²',fontsize=7,color=SUBTEXT)
+        schart(ax_s,'DISTRIBUCIÓN IMPACTO',ACCENT)
+    else:
+        schart(ax_s,'VELOCIDAD  [m/s]',ACCENT)
+
+    plt.tight_layout(pad=0); return fig
+
+def _export(r, pal, cad_series, fmt):
+    plt = _mpl()[0]
+    buf = io.BytesIO()
+    dfig = build_fig(r, pal, cad_series)
+    dfig.savefig(buf, format=fmt, dpi=150, bbox_inches='tight', facecolor=pal["BG"])
+    plt.close(dfig)
+    return buf.getvalue()
+
+@profiled
+def dashboard_png(r, pal, cad_series=None):
+    return _export(r, pal, cad_series, 'png')
+
+@profiled
+def dashboard_pdf(r, pal, cad_series=None):
+    return _export(r, pal, cad_series, 'pdf')
@@ -0,0 +1,85 @@
+"""Constantes y parámetros compartidos por el motor y la app."""
+import os
+
+SAMPLE_RATE  = 100
+HISTORY_DB   = "rba_sessions.db"     # SQLite en modo WAL
+HISTORY_FILE = "rba_sessions.json"   # formato anterior; se migra una vez al abrir la base
+PROFILE_FILE = "rba_profile.json"
+
+CACHE_DIR     = ".rba_cache"
+CACHE_MAX_MB  = 512                   # tope en disco del cache de sesiones
+CACHE_VERSION = 2                     # subir si cambia el formato o la normalización
+CACHE_COLS    = ['time','x','y','z','speed','altitude']
+BATCH_CACHE_DIR = os.path.join(CACHE_DIR,"batch")   # python -m rba.batch --cache: aparte del de la app
+BATCH_CACHE_MB  = 2048
+
+RESULT_CACHE_SIZE = 16               # análisis en memoria (compartidos entre usuarios)
+RESULT_CACHE_MB   = 256              # tope en memoria de esos análisis (señales incluidas)
+FIG_CACHE_SIZE    = 64               # figuras y series derivadas en memoria
+RENDER_WORKERS    = 2                # procesos para exportar dashboards (PNG/PDF)
+RENDER_MAX_PENDING = 8               # trabajos en cola o en curso; más se rechazan
+ANALYZE_WORKERS   = int(os.environ.get("RBA_ANALYZE_WORKERS", "1"))   # procesos por sesión larga (1 = en serie)
+ANALYZE_MAX_WORKERS = 4              # tope, además de los núcleos asignados al proceso
+ANALYZE_IDLE_S    = 60               # los procesos se cierran tras este tiempo sin trabajos
+CHUNK_MIN_SAMPLES = 10_000_000       # menos muestras (~28 h a 100 Hz): en serie, el pool no se amortiza
+CHUNK_CORE_MIN_S  = 600              # duración mínima de cada bloque (sin márgenes)
+CHUNK_OVERLAP_S   = 30               # margen a cada lado: absorbe el transitorio de filtfilt
+RESULT_DISK_DIR   = os.path.join(CACHE_DIR,"results")   # None desactiva el nivel en disco
+RESULT_DISK_MB    = 256
+
+CHART_WIDTH_PX   = 1200               # ancho de referencia de las gráficas (px)
+CHART_PTS_PER_PX = 2                  # puntos por columna de píxeles al diezmar series
+
+CSV_CHUNK_ROWS   = 250_000            # filas por bloque en modo streaming (pandas)
+CSV_BLOCK_BYTES  = 1024 * 1024          # bloque de pyarrow en modo streaming (lee ~40 por adelantado)
+CSV_STREAM_BYTES = 32 * 1024 * 1024   # archivos más grandes se leen por bloques
+
+COL_ALIASES = {
+    'x':        ['x','accel_x','acceleration x (m/s^2)'],
+    'y':        ['y','accel_y','acceleration y (m/s^2)'],
+    'z':        ['z','accel_z','acceleration z (m/s^2)'],
+    'speed':    ['speed','velocity'],
+    'altitude': ['altitude','alt','elevation'],
+}
+
+# Modo en vivo (rba/live.py)
+LIVE_HOST      = os.environ.get("RBA_LIVE_HOST", "127.0.0.1")
+LIVE_PORT      = int(os.environ.get("RBA_LIVE_PORT", "8765"))
+LIVE_BUFFER_S  = 30                   # señal cruda retenida por atleta (s)
+LIVE_STEPS     = 512                  # pisadas recientes retenidas por atleta
+LIVE_FI_WINDOWS = 240                 # ventanas de fatiga retenidas (8 h a 2 min)
+LIVE_MAX_FS    = 1000
+LIVE_MAX_ATHLETES = 64
+LIVE_IDLE_S    = 1800                 # se descarta un atleta sin datos por este tiempo
+LIVE_GAP_S     = 300                  # un hueco mayor en el tiempo empieza una sesión nueva
+LIVE_REFRESH_S = 0.5                  # refresco de la página En vivo
+LIVE_MAX_BODY  = 2 * 1024 * 1024      # bytes por POST
+LIVE_TOKEN     = os.environ.get("RBA_LIVE_TOKEN") or None   # obligatorio fuera de loopback
+
+# Parámetros de los algoritmos: forman parte de la clave del cache de resultados
+ALGO = {
+    "version":       2,                 # 2: índice de fatiga sin el tope de 1 h
+    "lp_cut":        20,
+    "step_band":     (1.5, 4),
+    "cad_window":    40,
+    "fi_window_min": 2,
+    "fi_overlap":    0.0,               # fracción de solape entre ventanas de fatiga [0, 1)
+}
+
+# Etapas del análisis: (% de la barra al empezar, texto)
+STAGES = {
+    "cache":        (5,  "Buscando resultado previo..."),
+    "load":         (15, "Cargando datos..."),
+    "preprocess":   (35, "Preprocesando señal..."),
+    "detect_steps": (55, "Detectando pisadas..."),
+    "metrics":      (75, "Calculando métricas..."),
+    "history":      (90, "Guardando sesión..."),
+}
+
+DEVICE_POSITIONS = {
+    "Pecho / Arnés":      {"gss_good": (0, 3),  "gss_warn": (3, 6)},
+    "Brazo / Muñeca":     {"gss_good": (1, 4),  "gss_warn": (4, 8)},
+    "Bolsillo / Cintura": {"gss_good": (2, 6),  "gss_warn": (6, 10)},
+    "Espalda / Canguro":  {"gss_good": (4, 9),  "gss_warn": (9, 13)},
+    "Mano (sostenido)":   {"gss_good": (3, 8),  "gss_warn": (8, 14)},
+}
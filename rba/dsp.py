@@ -0,0 +1,135 @@
+"""Filtrado y detección de pisadas."""
+import threading
+
+import numpy as np
+
+from .config import SAMPLE_RATE, ALGO
+from .profiling import profiled
+
+
+class FilterBank:
+    """Registro de Butterworth diseñados (SOS), compartido por todo el proceso.
+
+    Cada combinación (tipo, fs, banda, orden) se diseña una sola vez; designs()
+    lista lo que hay en el registro con sus usos, para inspección.
+    """
+    def __init__(self):
+        self._sos={}; self._uses={}; self._lock=threading.Lock()
+
+    @staticmethod
+    def _key(btype, fs, band, order):
+        band=tuple(float(b) for b in band) if btype=='band' else float(band)
+        return btype, float(fs), band, int(order)
+
+    @staticmethod
+    def _design(btype, fs, band, order):
+        from scipy.signal import butter
+        nyq=fs/2
+        wn=[band[0]/nyq, min(band[1]/nyq,0.99)] if btype=='band' else min(band/nyq,0.99)
+        return butter(order, wn, btype=btype, output='sos')
+
+    def sos(self, btype, fs, band, order=4, dtype=np.float64):
+        key=self._key(btype, fs, band, order)
+        with self._lock:
+            if key not in self._sos:
+                sos=self._design(*key)
+                self._sos[key]={np.dtype(np.float64): sos, np.dtype(np.float32): sos.astype(np.float32)}
+                self._uses[key]=0
+            self._uses[key]+=1
+            return self._sos[key][np.dtype(dtype)]
+
+    def designs(self):
+        with self._lock:
+            return [{"btype":k[0], "fs":k[1], "band":k[2], "order":k[3],
+                     "sections":len(v[np.dtype(np.float64)]), "uses":self._uses[k],
+                     "sos":v[np.dtype(np.float64)].copy()}
+                    for k,v in self._sos.items()]
+
+    def clear(self):
+        with self._lock: self._sos.clear(); self._uses.clear()
+
+filters = FilterBank()
+
+def _filtfilt(sos, data):
+    """sosfiltfilt a lo largo del eje 0."""
+    from scipy.signal import sosfiltfilt
+    return sosfiltfilt(sos, data, axis=0)
+
+def _dtype(data):
+    return np.float32 if getattr(data,'dtype',None)==np.float32 else np.float64
+
+@profiled
+def butter_bp(data, lo, hi, fs, order=4):
+    data=np.asarray(data)
+    return _filtfilt(filters.sos('band', fs, (lo,hi), order, _dtype(data)), data)
+
+@profiled
+def butter_lp(data, cutoff, fs, order=4):
+    data=np.asarray(data)
+    return _filtfilt(filters.sos('low', fs, cutoff, order, _dtype(data)), data)
+
+def est_fs(t):
+    """Frecuencia de muestreo a partir del vector de tiempos (s)."""
+    if t is not None and len(t)>10:
+        dt=np.median(np.diff(t))
+        if dt>0: return round(1/dt)
+    return SAMPLE_RATE
+
+def signals(df):
+    """Representación compacta de una sesión sin copiar el DataFrame.
+
+    dict con time (float64: float32 no alcanza para horas a 100+ Hz), fs escalar,
+    axes presentes y xyz (N, len(axes)) float32 contiguo, con NaN → 0. Con un
+    SignalStore son vistas sobre el archivo mapeado (y 'store' lleva su ruta).
+    """
+    if hasattr(df,'signals'): return df.signals()
+    t=df['time'].to_numpy(dtype=np.float64)
+    axes=[ax for ax in ('x','y','z') if ax in df.columns]
+    xyz=np.ascontiguousarray(df[axes].to_numpy(dtype=np.float32, na_value=0)) if axes else None
+    return {"time":t, "fs":est_fs(t), "axes":axes, "xyz":xyz}
+
+@profiled
+def preprocess(acc):
+    """Pasabajos de los ejes en una sola llamada sobre el arreglo (N, 3) float32.
+    Acepta un DataFrame o el dict de signals(); devuelve el dict con 'filt' en
+    lugar de 'xyz' (la señal cruda no se conserva)."""
+    sg=signals(acc) if not isinstance(acc,dict) else dict(acc)
+    xyz=sg.pop("xyz",None)
+    sg["filt"]=butter_lp(xyz, min(ALGO["lp_cut"],sg["fs"]/2-1), sg["fs"]) if xyz is not None else None
+    return sg
+
+def axis(sg, ax):
+    """Columna filtrada de un eje, o None si la sesión no lo tiene."""
+    return sg["filt"][:,sg["axes"].index(ax)] if ax in sg["axes"] else None
+
+def step_envelope(sg):
+    """Magnitud en banda de paso (float64 por estabilidad) y su envolvente."""
+    from scipy.ndimage import uniform_filter1d
+    fs=sg["fs"]; f=sg["filt"]
+    if len(sg["axes"])==3:
+        raw=np.sqrt(np.einsum('ij,ij->i',f,f,dtype=np.float64))
+    else:
+        col=axis(sg,'z'); raw=(col if col is not None else f[:,0]).astype(np.float64)
+    sig=butter_bp(raw,*ALGO["step_band"],fs)
+    del raw
+    return sig, uniform_filter1d(np.abs(sig),size=int(fs*0.1))
+
+def find_steps(env, fs):
+    """Índices de pisada: picos de la envolvente con umbrales relativos a toda la sesión."""
+    from scipy.signal import find_peaks
+    peaks,_=find_peaks(env,height=np.percentile(env,65),
+                       distance=int(fs*0.27),prominence=np.std(env)*0.5)
+    if len(peaks)<4:
+        peaks,_=find_peaks(env,height=np.mean(env),distance=int(fs*0.27),
+                           prominence=np.std(env)*0.2)
+    return peaks
+
+@profiled
+def detect_steps(sg, keep=False):
+    """Picos de pisada sobre la envolvente de la magnitud en banda de paso.
+    Con keep=True guarda step_signal y step_envelope (float32) en sg."""
+    sig,env=step_envelope(sg)
+    peaks=find_steps(env, sg["fs"])
+    if keep:
+        sg["step_signal"]=sig.astype(np.float32); sg["step_envelope"]=env.astype(np.float32)
+    return peaks, sg["time"][peaks], np.abs(sig[peaks])
@@ -0,0 +1,181 @@
+"""Persistencia del perfil del atleta y del historial de sesiones.
+
+El historial vive en SQLite (modo WAL): cada sesión es una fila con columnas
+indexadas (fecha, dispositivo, atleta) y el registro completo como JSON en
+`data`. Agregar una sesión es un INSERT, no reescribir el archivo, y varios
+procesos (app, rba.batch) pueden escribir a la vez sin corromperlo.
+"""
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing, contextmanager
+
+from .config import HISTORY_DB, HISTORY_FILE, PROFILE_FILE
+from .profiling import profiled
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id      INTEGER PRIMARY KEY,
+    date    TEXT NOT NULL,
+    device  TEXT,
+    athlete TEXT,
+    data    TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_date    ON sessions(date);
+CREATE INDEX IF NOT EXISTS sessions_device  ON sessions(device, date);
+CREATE INDEX IF NOT EXISTS sessions_athlete ON sessions(athlete, date);
+"""
+_ready = set()      # bases ya inicializadas en este proceso
+_version = 0        # escrituras hechas por este proceso (invalida history_cache)
+
+
+def load_profile():
+    if os.path.exists(PROFILE_FILE):
+        with open(PROFILE_FILE) as f: return json.load(f)
+    return {"name":"","weight":70,"height":170,"goal":"Mejorar resistencia","level":"Intermedio","default_device":"Espalda / Canguro"}
+
+def save_profile(p):
+    with open(PROFILE_FILE,"w") as f: json.dump(p, f, indent=2)
+
+# ─────────────────────────────────────────────
+#  HISTORIAL (SQLite)
+# ─────────────────────────────────────────────
+def _row(s):
+    return (s.get("date",""), s.get("device"), s.get("athlete") or None, json.dumps(s))
+
+def _migrate(con):
+    """Importa rba_sessions.json una sola vez y lo renombra a .migrated."""
+    if not os.path.exists(HISTORY_FILE): return
+    con.execute("BEGIN IMMEDIATE")          # bloquea a otros escritores mientras migra
+    try:
+        if not os.path.exists(HISTORY_FILE):    # otro proceso se adelantó
+            con.rollback(); return
+        with open(HISTORY_FILE) as f: old = json.load(f)
+        con.executemany("INSERT INTO sessions(date,device,athlete,data) VALUES (?,?,?,?)",
+                        [_row(s) for s in old])
+        os.replace(HISTORY_FILE, HISTORY_FILE + ".migrated")   # aún con el bloqueo tomado
+    except Exception:
+        con.rollback(); raise
+    try:
+        con.commit()
+    except Exception:
+        os.replace(HISTORY_FILE + ".migrated", HISTORY_FILE); raise
+
+@contextmanager
+def _db():
+    """Conexión corta por operación (sqlite3 no comparte conexiones entre hilos)."""
+    with closing(sqlite3.connect(HISTORY_DB, timeout=30, isolation_level=None)) as con:
+        key = os.path.abspath(HISTORY_DB)
+        if key not in _ready:
+            con.execute("PRAGMA journal_mode=WAL")
+            con.executescript(_SCHEMA)
+            _migrate(con)
+            _ready.add(key)
+        con.execute("PRAGMA synchronous=NORMAL")
+        yield con
+
+def load_history(device=None, athlete=None, since=None, limit=None):
+    """Sesiones en orden de inserción; los filtros usan los índices.
+    Con limit devuelve las `limit` más recientes."""
+    where, args = [], []
+    for col, val in (("device", device), ("athlete", athlete)):
+        if val is not None: where.append(f"{col} = ?"); args.append(val)
+    if since is not None: where.append("date >= ?"); args.append(since)
+    q = "SELECT data FROM sessions" + (" WHERE " + " AND ".join(where) if where else "")
+    q += " ORDER BY id DESC LIMIT ?" if limit else " ORDER BY id"
+    if limit: args.append(limit)
+    with _db() as con:
+        rows = [json.loads(d) for (d,) in con.execute(q, args)]
+    return rows[::-1] if limit else rows
+
+@profiled
+def append_history(s):
+    extend_history([s])
+
+def extend_history(sessions):
+    """Inserta todas las sesiones en una sola transacción (todas o ninguna)."""
+    rows = [_row(s) for s in sessions]
+    if not rows: return
+    with _db() as con:
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.executemany("INSERT INTO sessions(date,device,athlete,data) VALUES (?,?,?,?)", rows)
+            con.commit()
+        except Exception:
+            con.rollback(); raise
+    _bump()
+
+def session_record(r, athlete=None):
+    """Registro de historial de un resultado de analyze()."""
+    rec = {
+        "date":r["date"],"duration":round(r["dur"],1),
+        "steps":r["steps"],"device":r["device"],
+        "rei":r["rei"],"gss":r["gss"],"cadence":r["cadence"],
+        "asymmetry":r["asymmetry"],"fatigue_slope":r["fatigue_slope"],
+        "speed":round(r["speed"],2),
+        "timings":{s["stage"]:{"wall_ms":s["wall_ms"],"cpu_ms":s["cpu_ms"]} for s in r.get("timings",[])},
+    }
+    if athlete: rec["athlete"] = athlete
+    return rec
+
+def clear_history():
+    with _db() as con:
+        con.execute("DELETE FROM sessions")
+    _bump()
+
+def _bump():
+    global _version
+    _version += 1
+
+# ─────────────────────────────────────────────
+#  CACHE DE HISTORIAL (compartido por el proceso)
+# ─────────────────────────────────────────────
+def aggregate(sessions):
+    """Resumen de un historial en una sola pasada."""
+    n = len(sessions)
+    rei = sum(s["rei"] for s in sessions)
+    cad = sum(s["cadence"] for s in sessions)
+    mins = sum(s.get("duration",0) for s in sessions)
+    km = sum(s.get("speed",0)*s.get("duration",0)*60/1000 for s in sessions)
+    return {"count":n, "rei_mean":rei/n if n else 0.0, "cadence_mean":cad/n if n else 0.0,
+            "rei_best":max((s["rei"] for s in sessions), default=0.0),
+            "hours":mins/60, "km":km}
+
+class HistoryCache:
+    """Historial y agregados en memoria; se recarga solo si la base cambió.
+
+    La firma es (mtime, tamaño) de la base y de su -wal más el contador de
+    escrituras del proceso, así que también ve lo que escriben otros procesos.
+    Las listas devueltas son compartidas: no modificarlas.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sig = None
+        self._sessions, self._stats = [], aggregate([])
+
+    def _signature(self):
+        sig = [_version, os.path.abspath(HISTORY_DB)]
+        for p in (HISTORY_DB, HISTORY_DB + "-wal", HISTORY_FILE):
+            try:
+                st = os.stat(p); sig.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                sig.append(None)
+        return tuple(sig)
+
+    def _refresh(self):
+        sig = self._signature()
+        if sig == self._sig: return
+        with self._lock:
+            if sig == self._sig: return
+            sessions = load_history()
+            self._sessions, self._stats = sessions, aggregate(sessions)
+            self._sig = sig     # firma previa a la lectura: una escritura concurrente fuerza otra recarga
+
+    def sessions(self):
+        self._refresh(); return self._sessions
+
+    def stats(self):
+        self._refresh(); return self._stats
+
+history_cache = HistoryCache()
@@ -0,0 +1,170 @@
+"""Lectura de CSV de sensores (Sensor Logger, genérico time/x/y/z, "acceleration x (m/s^2)")."""
+import io
+import os
+
+import numpy as np
+
+from .config import COL_ALIASES, CSV_BLOCK_BYTES, CSV_CHUNK_ROWS, CSV_STREAM_BYTES
+from .profiling import profiled
+
+
+def _col_map(cols):
+    am={}
+    for c in cols:
+        for k,aliases in COL_ALIASES.items():
+            if c in aliases: am[c]=k
+    return am
+
+def _src_size(f):
+    if hasattr(f,'size'): return f.size
+    if isinstance(f,(str,os.PathLike)): return os.path.getsize(f)
+    return 0
+
+def _collect(chunks, rel):
+    """Une bloques {columna canónica: arreglo}: ns → s según el primer bloque, tiempo
+    relativo a la primera muestra válida (si rel) y sin filas con tiempo NaN."""
+    import pandas as pd
+    cols={}; scale=None; t0=None
+    for ch in chunks:
+        t=ch.pop('time')
+        if scale is None: scale=1e-9 if np.nanmedian(t)>1e12 else 1.0
+        t=t*scale if scale!=1.0 else t
+        if rel and t0 is None:
+            ok=~np.isnan(t)
+            if ok.any(): t0=t[ok][0]
+        if rel and t0 is not None: t=t-t0
+        keep=~np.isnan(t)
+        cols.setdefault('time',[]).append(t[keep])
+        for c,v in ch.items(): cols.setdefault(c,[]).append(v[keep])
+    return pd.DataFrame({c:np.concatenate(v) for c,v in cols.items()})
+
+def _pandas_chunks(f, use, dtypes, ren, chunksize):
+    """Bloques de pd.read_csv; con dtypes=None cada columna se coerciona (no numérico → NaN)."""
+    import pandas as pd
+    if hasattr(f,'seek'): f.seek(0)
+    for ch in pd.read_csv(f,usecols=use,dtype=dtypes,chunksize=chunksize):
+        ch=ch.rename(columns=ren)
+        if dtypes is None:
+            for c in ch.columns:
+                ch[c]=pd.to_numeric(ch[c],errors='coerce').astype('float64' if c=='time' else 'float32')
+        yield {c:ch[c].to_numpy() for c in ch.columns}
+
+def _arrow_chunks(f, use, ren):
+    """Bloques de pyarrow.csv.open_csv con tipos fijos. ImportError sin pyarrow o si f es
+    texto; ArrowInvalid (un ValueError) si hay celdas no numéricas."""
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    if isinstance(f,io.TextIOBase): raise ImportError    # pyarrow solo lee bytes
+    if hasattr(f,'seek'): f.seek(0)
+    rd=pacsv.open_csv(f,read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_BYTES),
+                      convert_options=pacsv.ConvertOptions(include_columns=use,column_types={
+                          r:pa.float64() if ren[r]=='time' else pa.float32() for r in use}))
+    for b in rd:
+        yield {ren[r]:b.column(i).to_numpy(zero_copy_only=False) for i,r in enumerate(b.schema.names)}
+
+def _header(f):
+    """Nombres de columna crudos de la primera línea, sin leer el resto del archivo."""
+    import csv
+    if isinstance(f,(str,os.PathLike)):
+        with open(f,'r',encoding='utf-8-sig',newline='') as fh: line=fh.readline()
+    else:
+        f.seek(0); line=f.readline(); f.seek(0)
+        if isinstance(line,bytes): line=line.decode('utf-8-sig')
+    return next(csv.reader([line]),[])
+
+def sniff(f):
+    """Formato según la cabecera: (columnas a leer, crudo → canónico, tiempo relativo).
+
+    Sensor Logger trae seconds_elapsed (ya relativo); el resto usa la primera
+    columna que contenga 'time', que se lleva al inicio de la sesión. Solo se leen
+    las columnas de COL_ALIASES: orientación, magnetómetro, etc. no se cargan.
+    """
+    raw=_header(f); low=[c.strip().lower() for c in raw]
+    if 'seconds_elapsed' in low: tc,rel='seconds_elapsed',False
+    else: tc,rel=next((c for c in low if 'time' in c),None),True
+    if tc is None: raise KeyError('time')
+    am=_col_map(low); am[tc]='time'
+    ren={}
+    for r,c in zip(raw,low):
+        if c in am and am[c] not in ren.values(): ren[r]=am[c]
+    return list(ren),ren,rel
+
+def _finish_time(t, rel):
+    """ns → s si hace falta y, si rel, relativo a la primera muestra válida."""
+    ok=~np.isnan(t)
+    if not ok.any(): return t
+    if np.median(t[ok])>1e12: t=t*1e-9
+    return t-t[ok][0] if rel else t
+
+def _read_fast(f, use, ren, rel):
+    """Solo las columnas usadas y con dtype fijo: pyarrow si está, si no pandas (motor C).
+    ValueError si hay celdas no numéricas."""
+    import pandas as pd
+    if hasattr(f,'seek'): f.seek(0)
+    types={r:('float64' if k=='time' else 'float32') for r,k in ren.items()}
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        if isinstance(f,io.TextIOBase): raise ImportError    # pyarrow solo lee bytes
+    except ImportError:
+        df=pd.read_csv(f,usecols=use,dtype=types,engine='c')
+        cols={ren[r]:df[r].to_numpy() for r in use}
+    else:
+        tbl=pacsv.read_csv(f,convert_options=pacsv.ConvertOptions(
+            include_columns=use,column_types={r:pa.float64() if t=='float64' else pa.float32()
+                                              for r,t in types.items()}))
+        cols={ren[r]:tbl.column(r).to_numpy() for r in use}
+    t=_finish_time(cols.pop('time'),rel); keep=~np.isnan(t)
+    out={'time':t[keep]}
+    out.update((c,v[keep]) for c,v in cols.items())
+    return pd.DataFrame(out)
+
+def _load_csv_stream(f, chunksize=CSV_CHUNK_ROWS):
+    """Lectura por bloques con dtypes fijos: la memoria pico depende del bloque, no del archivo.
+    pyarrow si está; pandas por bloques sin pyarrow o con celdas no numéricas (coerción)."""
+    use,ren,rel=sniff(f)
+    try:
+        return _collect(_arrow_chunks(f,use,ren),rel)
+    except ImportError:
+        pass
+    except ValueError:
+        return _collect(_pandas_chunks(f,use,None,ren,chunksize),rel)
+    # time en float64: en float32 la resolución a 3 h (~1 ms) no alcanza para estimar fs
+    dtypes={r:('float64' if k=='time' else 'float32') for r,k in ren.items()}
+    try:
+        return _collect(_pandas_chunks(f,use,dtypes,ren,chunksize),rel)
+    except ValueError:
+        # celdas no numéricas: se repite la pasada coercionando bloque a bloque
+        return _collect(_pandas_chunks(f,use,None,ren,chunksize),rel)
+
+@profiled
+def load_csv(f, stream=None):
+    """CSV de acelerómetro o GPS → DataFrame con time (s desde el inicio), x/y/z, speed, altitude.
+
+    La cabecera decide qué columnas leer (sniff) y se leen con dtype fijo; si hay
+    celdas no numéricas se cae a la lectura genérica, que las convierte en NaN.
+    Lanza KeyError si no hay columna de tiempo, o la excepción de pandas si el
+    archivo no se puede leer.
+    """
+    import pandas as pd
+    if stream is None: stream=_src_size(f)>CSV_STREAM_BYTES
+    if stream: return _load_csv_stream(f)
+    try:
+        return _read_fast(f,*sniff(f))
+    except (ValueError,KeyError):
+        pass        # celdas no numéricas o cabecera rara: lectura genérica con coerción
+    if hasattr(f,'seek'): f.seek(0)
+    df=pd.read_csv(f); df.columns=[c.strip().lower() for c in df.columns]
+    if 'seconds_elapsed' in df.columns:
+        df['time']=pd.to_numeric(df['seconds_elapsed'],errors='coerce')
+    else:
+        tc=next((c for c in df.columns if 'time' in c),None)
+        if tc:
+            raw=pd.to_numeric(df[tc],errors='coerce')
+            if raw.median()>1e12: raw=raw/1e9
+            df['time']=raw-raw.iloc[0]
+    df.rename(columns=_col_map(df.columns),inplace=True)
+    for ax in ['x','y','z']:
+        if ax in df.columns: df[ax]=pd.to_numeric(df[ax],errors='coerce')
+    df.dropna(subset=['time'],inplace=True); df.reset_index(drop=True,inplace=True)
+    return df
@@ -0,0 +1,384 @@
+"""Ingesta en vivo: un teléfono (o el simulador) envía bloques de acelerómetro por
+HTTP y se mantienen métricas por atleta en memoria acotada.
+
+    RBA_LIVE_TOKEN=... python -m rba.live serve [--host 0.0.0.0] [--port 8765]
+    python -m rba.live simulate --athlete Ana [--url http://127.0.0.1:8765] [--rate 100]
+
+Cada atleta tiene un LiveSession con arreglos circulares de tamaño fijo (señal de
+los últimos LIVE_BUFFER_S s, últimas LIVE_STEPS pisadas y LIVE_FI_WINDOWS ventanas
+de fatiga) y un OnlineStepDetector; cada bloque actualiza cadencia, asimetría,
+impacto (GSS), REI e índice de fatiga de forma incremental (acumuladores de
+accum.py), así que la memoria por atleta no crece con la duración de la sesión.
+
+API (JSON):
+    POST /ingest/<atleta>   {"fs": 100, "t": [...], "x": [...], "y": [...], "z": [...]}
+                            ?reset=1 empieza una sesión nueva; las muestras con t ya
+                            recibido se descartan (reintentos) y un bloque sin muestras
+                            nuevas responde 409
+    GET  /live              atletas activos
+    GET  /live/<atleta>     métricas y series recientes (lo mismo que muestra la app)
+
+Sin CORS: una página web abierta en el mismo navegador no puede leer ni enviar
+datos (el POST exige Content-Type application/json, que fuerza un preflight que
+no se responde). Con RBA_LIVE_TOKEN todas las rutas piden la cabecera
+X-RBA-Token; es obligatorio para escuchar fuera de loopback (p. ej. 0.0.0.0).
+Sin token solo se aceptan pedidos con Host local (evita el DNS rebinding).
+"""
+import argparse
+import hmac
+import ipaddress
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import numpy as np
+
+from .config import (ALGO, LIVE_BUFFER_S, LIVE_FI_WINDOWS, LIVE_GAP_S, LIVE_HOST, LIVE_IDLE_S,
+                     LIVE_MAX_ATHLETES, LIVE_MAX_BODY, LIVE_MAX_FS, LIVE_PORT, LIVE_STEPS,
+                     LIVE_TOKEN)
+from .accum import Moments, SessionAccumulator
+from .online import OnlineStepDetector
+
+
+class StaleBatch(Exception):
+    """El bloque no trae muestras posteriores a las ya recibidas (HTTP 409)."""
+
+
+class RingBuffer:
+    """Arreglo circular de capacidad fija; extend() no reserva memoria."""
+    def __init__(self, capacity, width=None, dtype=np.float64):
+        self.buf=np.zeros((capacity,) if width is None else (capacity,width), dtype=dtype)
+        self.capacity=capacity; self.total=0
+
+    def __len__(self): return min(self.total, self.capacity)
+
+    def extend(self, a):
+        a=np.asarray(a, dtype=self.buf.dtype)
+        if len(a)>self.capacity: self.total+=len(a)-self.capacity; a=a[-self.capacity:]
+        i=self.total%self.capacity; k=min(len(a), self.capacity-i)
+        self.buf[i:i+k]=a[:k]; self.buf[:len(a)-k]=a[k:]
+        self.total+=len(a)
+
+    def last(self, n=None):
+        """Copia ordenada de los últimos n elementos (todos si n es None)."""
+        n=len(self) if n is None else min(n, len(self))
+        i=self.total%self.capacity
+        idx=np.arange(i-n, i)%self.capacity
+        return self.buf[idx]
+
+
+class LiveSession:
+    """Estado en vivo de un atleta: anillos de señal y pisadas + acumuladores."""
+    def __init__(self, athlete, fs):
+        self.athlete=athlete; self.fs=fs
+        cap=int(LIVE_BUFFER_S*fs)
+        self.t=RingBuffer(cap); self.xyz=RingBuffer(cap, 3, np.float32)
+        self.step_t=RingBuffer(LIVE_STEPS); self.step_v=RingBuffer(LIVE_STEPS)
+        self.latency=RingBuffer(LIVE_STEPS)
+        self.fi_t=RingBuffer(LIVE_FI_WINDOWS); self.fi_v=RingBuffer(LIVE_FI_WINDOWS)
+        self.det=OnlineStepDetector(fs)
+        self.t0=None; self.last_t=None
+        self.acc=SessionAccumulator()               # REI y GSS de toda la sesión
+        self._win=None; self._wacc=Moments()        # ventana de fatiga en curso
+        self.metrics={"steps":0, "rei":0.0, "cadence":0.0, "asymmetry":0.0, "gss":0.0,
+                      "gss_recent":0.0, "fi":None}
+        self.received=0; self.updated=time.time(); self.process_ms=0.0
+        self.lock=threading.Lock()
+
+    def push(self, t, xyz):
+        """Agrega un bloque; descarta las muestras con t ya recibido (un reintento o
+        bloques solapados no duplican pisadas). StaleBatch si no queda ninguna."""
+        t0=time.perf_counter()
+        with self.lock:
+            if self.last_t is not None and t[0]<=self.last_t:
+                k=int(np.searchsorted(t, self.last_t, side='right'))
+                if k==len(t): raise StaleBatch(f"bloque ya recibido (último t={self.last_t:.3f})")
+                t,xyz=t[k:],xyz[k:]
+            if self.t0 is None: self.t0=float(t[0])
+            self.t.extend(t); self.xyz.extend(xyz)
+            pt,pv=self.det.push(t, xyz)
+            f=self.det.filtered
+            self.acc.add_signal(f[:,2] if f.shape[1]==3 else f[:,-1])
+            self.latency.extend(self.det.latencies); del self.det.latencies[:]
+            self.last_t=float(t[-1]); self.received+=len(t)
+            if len(pt): self._steps(pt, pv)
+            self.metrics["rei"]=self.acc.rei()
+            self.updated=time.time(); self.process_ms=(time.perf_counter()-t0)*1000
+        return len(pt)
+
+    def _steps(self, pt, pv):
+        self.step_t.extend(pt); self.step_v.extend(pv); self.acc.add_steps(pt, pv)
+        for ts,v in zip(pt, pv): self._fatigue(ts, v)
+        m=self.metrics; m["steps"]=self.step_t.total
+        from .metrics import calc_cad_asym
+        cad,asym=calc_cad_asym(self.step_t.last(ALGO["cad_window"]+1))
+        m["cadence"],m["asymmetry"]=float(cad),float(asym)
+        m["gss"]=self.acc.gss()
+        m["gss_recent"]=round(float(np.abs(self.step_v.last(ALGO["cad_window"])).mean()), 2)
+
+    def _fatigue(self, ts, v):
+        """Misma fórmula que calc_fi (sin solape), con Moments de la ventana en curso."""
+        k=int((ts-self.t0)//(ALGO["fi_window_min"]*60))
+        if k!=self._win:
+            self._close_window(); self._win=k; self._wacc=Moments()
+        self._wacc.update([v])
+        if self._wacc.n>=4: self.metrics["fi"]=self._fi(self._wacc)
+
+    @staticmethod
+    def _fi(m): return round(m.abs_mean*0.6+m.std*0.4, 3)
+
+    def _close_window(self):
+        if self._win is not None and self._wacc.n>=4:
+            self.fi_t.extend([self._win*ALGO["fi_window_min"]]); self.fi_v.extend([self._fi(self._wacc)])
+
+    def snapshot(self, seconds=10.0, points=600):
+        """Métricas y series recientes (listas, serializable a JSON)."""
+        from .charts import decimate
+        from .metrics import cad_over_time
+        with self.lock:
+            t=self.t.last(int(seconds*self.fs)); xyz=self.xyz.last(len(t))
+            st=self.step_t.last(); sv=self.step_v.last()
+            lat=self.latency.last(); fi_t=self.fi_t.last(); fi_v=self.fi_v.last()
+            snap=dict(self.metrics, athlete=self.athlete, fs=self.fs, received=self.received,
+                      elapsed=round(self.last_t-self.t0, 1) if self.t0 is not None else 0.0,
+                      age_s=round(time.time()-self.updated, 2), process_ms=round(self.process_ms, 2))
+            t_ref=self.t0 or 0.0
+            if self._win is not None and self._wacc.n>=4:
+                fi_t=np.append(fi_t, self._win*ALGO["fi_window_min"]); fi_v=np.append(fi_v, self._fi(self._wacc))
+        mag=np.sqrt(np.einsum('ij,ij->i', xyz, xyz, dtype=np.float64))
+        tx,mx=decimate(t-t_ref, mag, points)
+        recent=st>=(t[0] if len(t) else np.inf)
+        ct,cv=cad_over_time(st)
+        snap.update(
+            signal_t=np.asarray(tx).tolist(), signal_mag=np.asarray(mx).tolist(),
+            steps_t=(st[recent]-t_ref).tolist(), steps_v=sv[recent].tolist(),
+            cad_t=((np.asarray(ct)-t_ref)/60).tolist(), cad_v=np.asarray(cv).tolist(),
+            fi_t=np.asarray(fi_t).tolist(), fi_v=np.asarray(fi_v).tolist(),
+            latency_p50_ms=round(float(np.median(lat))*1000, 1) if len(lat) else None,
+            latency_p95_ms=round(float(np.percentile(lat, 95))*1000, 1) if len(lat) else None)
+        return snap
+
+
+class LiveHub:
+    """Sesiones en vivo por atleta, compartidas por el servidor y la app."""
+    def __init__(self, max_athletes=LIVE_MAX_ATHLETES, idle_s=LIVE_IDLE_S):
+        self.max_athletes=max_athletes; self.idle_s=idle_s
+        self._s={}; self._lock=threading.Lock()
+
+    def _expire(self):
+        now=time.time()
+        for k in [k for k,s in self._s.items() if now-s.updated>self.idle_s]: del self._s[k]
+
+    def push(self, athlete, fs, t, xyz, reset=False):
+        """Agrega un bloque. Una sesión nueva empieza con reset, si cambia fs o tras un
+        hueco de más de LIVE_GAP_S; un bloque solapado conserva la sesión (ver LiveSession.push)."""
+        with self._lock:
+            s=self._s.get(athlete)
+            if (s is None or reset or s.fs!=fs
+                    or (s.last_t is not None and t[0]-s.last_t>LIVE_GAP_S)):
+                self._expire()
+                if athlete not in self._s and len(self._s)>=self.max_athletes:
+                    raise OverflowError(f"máximo de {self.max_athletes} atletas en vivo")
+                s=self._s[athlete]=LiveSession(athlete, fs)
+        return s.push(t, xyz)
+
+    def get(self, athlete):
+        with self._lock: return self._s.get(athlete)
+
+    def snapshot(self, athlete, **kw):
+        s=self.get(athlete)
+        return s.snapshot(**kw) if s else None
+
+    def athletes(self):
+        with self._lock:
+            self._expire()
+            return [{"athlete":s.athlete, "steps":s.metrics["steps"], "fs":s.fs,
+                     "age_s":round(time.time()-s.updated, 1)} for s in self._s.values()]
+
+    def drop(self, athlete):
+        with self._lock: self._s.pop(athlete, None)
+
+hub = LiveHub()
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Servidor HTTP
+# ───────────────────────────────────────────────────────────────────────────────
+def parse_batch(body):
+    """JSON de /ingest → (fs, t, xyz (n,3) float32). ValueError si no es válido."""
+    d=json.loads(body)
+    t=np.asarray(d["t"], dtype=np.float64)
+    if "xyz" in d: xyz=np.asarray(d["xyz"], dtype=np.float32)
+    else: xyz=np.column_stack([np.asarray(d[ax], dtype=np.float32) for ax in ('x','y','z')])
+    if t.ndim!=1 or xyz.shape!=(len(t),3) or len(t)==0:
+        raise ValueError("t y x/y/z deben tener el mismo largo (> 0)")
+    if not (np.all(np.isfinite(t)) and np.all(np.diff(t)>0)):
+        raise ValueError("t debe ser finito y estrictamente creciente")
+    if "fs" in d: fs=float(d["fs"])
+    else:
+        from .dsp import est_fs
+        fs=float(est_fs(t)) if len(t)>10 else None
+    if not fs or not (1<=fs<=LIVE_MAX_FS): raise ValueError(f"fs inválida (1–{LIVE_MAX_FS} Hz)")
+    return round(fs), t, np.nan_to_num(xyz)
+
+
+TOKEN_HEADER = "X-RBA-Token"
+_LOCAL_NAMES = {"localhost", "127.0.0.1", "::1"}
+
+def _is_loopback(host):
+    if host in _LOCAL_NAMES: return True
+    try: return ipaddress.ip_address(host).is_loopback
+    except ValueError: return False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version="rba-live"
+
+    def _send(self, code, obj):
+        body=json.dumps(obj).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers(); self.wfile.write(body)
+
+    def _allowed(self):
+        """Con token: cabecera X-RBA-Token igual. Sin token (solo loopback): Host local."""
+        token=self.server.token
+        if token:
+            got=self.headers.get(TOKEN_HEADER) or ""
+            if hmac.compare_digest(got.encode(), token.encode()): return True
+            self._send(401, {"error":f"falta o no coincide {TOKEN_HEADER}"}); return False
+        host=(self.headers.get("Host") or "").rsplit(":",1)[0].strip("[]")
+        if host in _LOCAL_NAMES: return True
+        self._send(403, {"error":"Host no local"}); return False
+
+    def _athlete(self, prefix):
+        name=unquote(self.path.split("?")[0][len(prefix):]).strip()
+        return name[:64] or None
+
+    def do_POST(self):
+        if not self.path.startswith("/ingest/"): return self._send(404, {"error":"ruta desconocida"})
+        if not self._allowed(): return
+        if self.headers.get_content_type()!="application/json":
+            return self._send(415, {"error":"Content-Type debe ser application/json"})
+        raw=self.headers.get("Content-Length")
+        if raw is None: return self._send(411, {"error":"falta Content-Length"})
+        n=int(raw) if raw.strip().isdigit() else -1
+        if n>LIVE_MAX_BODY: return self._send(413, {"error":f"bloque mayor a {LIVE_MAX_BODY} bytes"})
+        if n<=0: return self._send(400, {"error":"Content-Length inválido"})
+        athlete=self._athlete("/ingest/")
+        if not athlete: return self._send(400, {"error":"falta el atleta"})
+        try:
+            fs,t,xyz=parse_batch(self.rfile.read(n))
+            reset=parse_qs(urlsplit(self.path).query).get("reset",["0"])[0] not in ("0","")
+            steps=hub.push(athlete, fs, t, xyz, reset=reset)
+        except StaleBatch as e: return self._send(409, {"error":str(e)})
+        except OverflowError as e: return self._send(503, {"error":str(e)})
+        except (ValueError, KeyError, TypeError) as e: return self._send(400, {"error":f"bloque inválido: {e}"})
+        self._send(200, {"ok":True, "steps":steps})
+
+    def do_GET(self):
+        if not self._allowed(): return
+        path=self.path.split("?")[0].rstrip("/")
+        if path=="/live": return self._send(200, hub.athletes())
+        if path.startswith("/live/"):
+            snap=hub.snapshot(self._athlete("/live/"))
+            return self._send(200, snap) if snap else self._send(404, {"error":"atleta sin datos"})
+        self._send(404, {"error":"ruta desconocida"})
+
+    def log_message(self, fmt, *args): pass
+
+
+_server=None; _server_lock=threading.Lock()
+
+def start_server(host=LIVE_HOST, port=LIVE_PORT, token=LIVE_TOKEN):
+    """Arranca (una vez por proceso) el servidor en un hilo de fondo; devuelve (host, port).
+    OSError si el puerto está ocupado; ValueError si host no es loopback y no hay token."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            if not token and not _is_loopback(host):
+                raise ValueError(f"para escuchar en {host} hay que definir RBA_LIVE_TOKEN")
+            _server=ThreadingHTTPServer((host, port), _Handler); _server.daemon_threads=True
+            _server.token=token
+            threading.Thread(target=_server.serve_forever, name="rba-live", daemon=True).start()
+        return _server.server_address[:2]
+
+def stop_server():
+    global _server
+    with _server_lock:
+        if _server is not None: _server.shutdown(); _server.server_close(); _server=None
+
+
+# ───────────────────────────────────────────────────────────────────────────────
+# Simulador
+# ───────────────────────────────────────────────────────────────────────────────
+def synth(t, cadence=170.0, fatigue_min=30.0, seed=None):
+    """Muestras como demo_data para tiempos arbitrarios (el impacto crece con los minutos)."""
+    rng=np.random.default_rng(seed)
+    fat=1+0.4*np.minimum(t/(fatigue_min*60), 1); ch=cadence/60
+    z=np.sin(2*np.pi*ch*t)*0.8*fat+rng.normal(0,.15,len(t))+9.81
+    x=np.sin(2*np.pi*ch*t+np.pi/4)*0.3*fat+rng.normal(0,.1,len(t))
+    y=np.sin(2*np.pi*ch*t+np.pi/2)*0.15+rng.normal(0,.08,len(t))
+    return np.column_stack([x,y,z])
+
+def simulate(url, athlete, fs=100, batch_s=0.2, duration=0.0, cadence=170.0, quiet=False, token=LIVE_TOKEN):
+    """Envía bloques de batch_s segundos a ritmo real hasta duration (0 = sin fin)."""
+    from urllib.parse import quote
+    from urllib.request import Request, urlopen
+    endpoint=f"{url.rstrip('/')}/ingest/{quote(athlete)}"
+    n=max(1, int(batch_s*fs)); k=0; start=time.perf_counter(); steps=0
+    rng=np.random.default_rng(); headers={"Content-Type":"application/json"}
+    if token: headers[TOKEN_HEADER]=token
+    while not duration or k/fs<duration:
+        t=(k+np.arange(n))/fs; k+=n
+        xyz=synth(t, cadence, seed=int(rng.integers(1<<31)))
+        body=json.dumps({"fs":fs, "t":t.round(4).tolist(), "x":xyz[:,0].round(4).tolist(),
+                         "y":xyz[:,1].round(4).tolist(), "z":xyz[:,2].round(4).tolist()}).encode()
+        req=Request(endpoint+("?reset=1" if k==n else ""), data=body, headers=headers)
+        with urlopen(req, timeout=5) as resp: steps+=json.loads(resp.read())["steps"]
+        if not quiet: print(f"\r{athlete}: {t[-1]:7.1f} s  {steps} pisadas", end="", file=sys.stderr)
+        wait=start+k/fs-time.perf_counter()
+        if wait>0: time.sleep(wait)
+    if not quiet: print(file=sys.stderr)
+    return steps
+
+
+def main(argv=None):
+    ap=argparse.ArgumentParser(prog="python -m rba.live", description=__doc__.split("\n")[0])
+    sub=ap.add_subparsers(dest="cmd", required=True)
+    s=sub.add_parser("serve", help="solo el servidor de ingesta")
+    s.add_argument("--host", default=LIVE_HOST); s.add_argument("--port", type=int, default=LIVE_PORT)
+    s.add_argument("--token", default=LIVE_TOKEN, help="por defecto RBA_LIVE_TOKEN")
+    s=sub.add_parser("simulate", help="envía datos sintéticos como lo haría un teléfono")
+    s.add_argument("--athlete", default="Simulado")
+    s.add_argument("--url", default=f"http://127.0.0.1:{LIVE_PORT}")
+    s.add_argument("--rate", type=int, default=100, help="frecuencia de muestreo (Hz)")
+    s.add_argument("--batch", type=float, default=0.2, help="segundos por envío")
+    s.add_argument("--duration", type=float, default=0, help="segundos (0 = hasta Ctrl+C)")
+    s.add_argument("--cadence", type=float, default=170.0)
+    s.add_argument("--token", default=LIVE_TOKEN, help="por defecto RBA_LIVE_TOKEN")
+    a=ap.parse_args(argv)
+    try:
+        if a.cmd=="serve":
+            host,port=start_server(a.host, a.port, a.token)
+            print(f"escuchando en http://{host}:{port}", file=sys.stderr)
+            while True:
+                time.sleep(5)
+                for x in hub.athletes():
+                    snap=hub.snapshot(x["athlete"])
+                    print(f"  {x['athlete']:<20} {snap['steps']:>6} pisadas  {snap['cadence']:>5.1f} ppm  "
+                          f"GSS {snap['gss']:.2f}  FI {snap['fi']}", file=sys.stderr)
+        simulate(a.url, a.athlete, a.rate, a.batch, a.duration, a.cadence, token=a.token)
+    except KeyboardInterrupt:
+        pass
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr); return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Métricas de sesión: economía (REI), impacto, cadencia, asimetría y fatiga."""
+import numpy as np
+
+from .config import ALGO
+from .dsp import axis
+from .profiling import profiled
+
+
+# Las fórmulas reciben estadísticos ya reducidos: las usan tanto las funciones
+# calc_* (arreglos completos) como los acumuladores combinables de accum.py.
+def rei_score(z_var, z_p95, pv_n, pv_std, pv_abs_mean):
+    sr=max(z_p95,1e-6)
+    sv=max(0,1-z_var/sr**2*3)
+    sc=max(0,1-pv_std/(pv_abs_mean+1e-6)*2) if pv_n>4 else 0.5
+    return round((sv*0.6+sc*0.4)*100,1)
+
+def cad_asym_score(med, l_mean, r_mean):
+    """l_mean/r_mean: medias de intervalos pares/impares truncados al mismo largo (None si no hay)."""
+    if med<=0: return 0.0,0.0
+    asym=abs(l_mean-r_mean)/med*100 if l_mean is not None else 0
+    return round(60/med,1), round(asym,2)
+
+@profiled
+def calc_rei(accel, peak_values):
+    zf=axis(accel,'z')
+    z=(zf.astype(np.float64) if zf is not None else np.full(len(accel["time"]),9.81))-9.81
+    pv=np.asarray(peak_values)
+    return rei_score(np.var(z), np.percentile(np.abs(z),95), len(pv),
+                     np.std(pv) if len(pv) else 0.0, np.mean(np.abs(pv)) if len(pv) else 0.0)
+
+@profiled
+def calc_gss(pv): return round(np.mean(np.abs(pv)),2)
+
+@profiled
+def calc_cad_asym(pt):
+    if len(pt)<4: return 0.0,0.0
+    iv=np.diff(pt); vc=(iv>=0.25)&(iv<=1.0)
+    ic=iv[vc] if vc.sum()>2 else iv
+    l,r=ic[0::2],ic[1::2]; n=min(len(l),len(r))
+    return cad_asym_score(np.median(ic), np.mean(l[:n]) if n else None, np.mean(r[:n]) if n else None)
+
+def _rolling_valid_median(iv, ws, lo, hi, block=8192):
+    """Mediana de los intervalos en [lo,hi] de cada ventana de ws, y su cantidad.
+    Vectorizado por bloques de ventanas: los inválidos van a +inf, se ordena cada
+    fila y la mediana se toma según la cantidad de válidos (igual que np.median)."""
+    from numpy.lib.stride_tricks import sliding_window_view
+    vals = np.where((iv>=lo)&(iv<=hi), iv, np.inf)
+    win = sliding_window_view(vals, ws)
+    med = np.empty(len(win)); cnt = np.empty(len(win), dtype=np.int64)
+    for a in range(0, len(win), block):
+        srt = np.sort(win[a:a+block], axis=1)
+        k = np.isfinite(srt).sum(axis=1)
+        lo_i = np.maximum((k-1)//2, 0)[:,None]; hi_i = (k//2)[:,None]
+        m = (np.take_along_axis(srt, lo_i, 1) + np.take_along_axis(srt, hi_i, 1))[:,0] / 2
+        med[a:a+block] = m; cnt[a:a+block] = k
+    return med, cnt
+
+@profiled
+def cad_over_time(pt, ws=ALGO["cad_window"]):
+    if len(pt)<5: return np.array([]),np.array([])
+    if len(pt)<ws+1: ws=max(10,len(pt)//3)
+    iv=np.diff(pt); tm=pt[1:]
+    if len(iv)<ws: return np.array([]),np.array([])
+    med,cnt=_rolling_valid_median(iv,ws,0.27,1.0)
+    ok=cnt>ws*0.5
+    if ok.sum()<3: return np.array([]),np.array([])
+    from scipy.ndimage import gaussian_filter1d
+    cads=60/med[ok]; tout=tm[np.flatnonzero(ok)+ws//2]
+    return tout, np.clip(gaussian_filter1d(cads,sigma=6),100,230)
+
+@profiled
+def calc_fi(accel, pt, pv, wm=ALGO["fi_window_min"], overlap=ALGO["fi_overlap"]):
+    """Índice de fatiga por ventanas de wm minutos (solapadas según overlap).
+    Cada ventana es un rango [lo,hi) de pt vía searchsorted; media y desvío salen
+    de sumas acumuladas, con los valores centrados para que la varianza sea estable."""
+    if not (0<=overlap<1): raise ValueError("overlap debe estar en [0, 1)")
+    tt=accel['time'].max(); w=wm*60; step=w*(1-overlap)
+    starts=np.arange(0,tt,step)
+    if len(pv)==0 or len(starts)==0: return [],[]
+    pv=np.asarray(pv,dtype=np.float64); c=pv-pv.mean()
+    cs=lambda v: np.concatenate([[0.0],np.cumsum(v)])
+    sa,s1,s2=cs(np.abs(pv)),cs(c),cs(c*c)
+    lo=np.searchsorted(pt,starts,'left'); hi=np.searchsorted(pt,starts+w,'left')
+    n=hi-lo; ok=n>=4; lo,hi,n=lo[ok],hi[ok],n[ok]
+    mean_abs=(sa[hi]-sa[lo])/n
+    m1=(s1[hi]-s1[lo])/n
+    std=np.sqrt(np.maximum((s2[hi]-s2[lo])/n-m1*m1,0))
+    fv=np.round(mean_abs*0.6+std*0.4,3)
+    return (starts[ok]/60).tolist(), fv.tolist()
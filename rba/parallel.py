@@ -0,0 +1,124 @@
+"""Análisis de una sesión larga partida en bloques de tiempo, en un pool de procesos.
+
+Cada bloque se filtra con CHUNK_OVERLAP_S de señal extra a cada lado, así que el
+transitorio de borde de filtfilt (y de la media móvil de la envolvente) cae en
+los márgenes y se descarta; el proceso devuelve solo su núcleo: envolvente y
+|señal de pisada| en float32 (la mitad de datos que copiar de vuelta) y un
+SessionAccumulator con los estadísticos del eje z. Los núcleos son contiguos y
+sin solape, por lo que no hay pisadas repetidas que eliminar en las uniones: los
+picos se buscan una sola vez sobre la envolvente unida, con los mismos umbrales
+globales (percentil 65, desvío) que en serie, y la restricción de distancia de
+find_peaks se respeta también a través de ellas.
+
+Tolerancia frente a analyze() en serie (tests/test_parallel.py fuerza el
+análisis por bloques y la comprueba): pisadas idénticas, cadencia, asimetría,
+GSS y fatiga iguales; el REI usa el percentil 95 de |z| del sketch (error
+relativo ≤ 1e-4), así que puede diferir en ±0,1 por el redondeo. La envolvente
+difiere de la de serie en el redondeo a float32 (~1e-7 relativo).
+
+Arrancar procesos spawn cuesta segundos (importar numpy/scipy en cada uno), así
+que solo se parte por encima de CHUNK_MIN_SAMPLES y con ANALYZE_WORKERS > 1 (por
+defecto la app analiza en serie). El pool se comparte entre hilos: se reserva
+mientras hay trabajos y se cierra tras ANALYZE_IDLE_S sin uso.
+"""
+import threading
+
+import numpy as np
+
+from .accum import SessionAccumulator
+from .config import (ANALYZE_IDLE_S, ANALYZE_MAX_WORKERS, ANALYZE_WORKERS, CHUNK_CORE_MIN_S,
+                     CHUNK_MIN_SAMPLES, CHUNK_OVERLAP_S)
+from .procs import available_cpus, bare_main
+
+_pool = None
+_pool_size = 0
+_active = 0         # llamadas a envelopes() usando el pool
+_idle = None        # Timer que cierra el pool ocioso
+_lock = threading.Lock()
+
+
+def _cap(workers):
+    """Procesos a usar: workers, acotado por ANALYZE_MAX_WORKERS y los núcleos asignados."""
+    return max(1, min(workers, ANALYZE_MAX_WORKERS, available_cpus()))
+
+
+def plan(n, fs, workers=ANALYZE_WORKERS):
+    """Núcleos [lo, hi) de los bloques; una sola pieza si no conviene partir."""
+    k = min(_cap(workers), int(n/fs//CHUNK_CORE_MIN_S)) if n >= CHUNK_MIN_SAMPLES else 1
+    if k < 2: return [(0, n)]
+    edges = np.linspace(0, n, k+1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _chunk(xyz, axes, fs, lo, hi):
+    """Corre en el pool: xyz incluye los márgenes; [lo, hi) es el núcleo dentro de él.
+    xyz puede ser (ruta .rba, a, b): el bloque se toma del archivo mapeado sin copiarlo."""
+    from .dsp import axis, preprocess, step_envelope
+    if isinstance(xyz, tuple):
+        from .store import SignalStore
+        path, a, b = xyz; xyz = SignalStore(path).xyz[a:b]
+    sg = preprocess({"time": None, "fs": fs, "axes": axes, "xyz": xyz})
+    sig, env = step_envelope(sg)
+    z = axis(sg, 'z')
+    acc = SessionAccumulator().add_signal(z[lo:hi] if z is not None else np.full(hi-lo, 9.81))
+    return env[lo:hi].astype(np.float32), np.abs(sig[lo:hi]).astype(np.float32), acc
+
+
+def _acquire(workers):
+    """Pool reservado hasta _release(); se crea (o cambia de tamaño) solo si nadie lo usa."""
+    global _pool, _pool_size, _active
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import get_context
+    with _lock:
+        if _idle is not None: _idle.cancel()
+        if _pool is not None and _pool_size != workers and _active == 0: _close()
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn"))
+            _pool_size = workers
+        _active += 1
+        return _pool
+
+
+def _release():
+    global _active, _idle
+    with _lock:
+        _active -= 1
+        if _active == 0 and _pool is not None:
+            _idle = threading.Timer(ANALYZE_IDLE_S, _close_idle); _idle.daemon = True; _idle.start()
+
+
+def _close_idle():
+    with _lock:
+        if _active == 0: _close()
+
+
+def _close():
+    """Con _lock tomado y sin trabajos en curso."""
+    global _pool
+    if _pool is not None: _pool.shutdown(wait=False); _pool = None
+
+
+def shutdown():
+    """Cierra el pool si está ocioso; si hay trabajos, lo cierra el temporizador al terminar."""
+    with _lock:
+        if _active == 0: _close()
+
+
+def envelopes(sg, chunks, workers=ANALYZE_WORKERS):
+    """(envolvente, |señal de pisada|, SessionAccumulator con z) de toda la sesión,
+    calculados por bloques en el pool. sg es el dict de dsp.signals()."""
+    n = len(sg["time"]); pad = int(CHUNK_OVERLAP_S*sg["fs"])
+    jobs = []
+    pool = _acquire(_cap(workers))
+    try:
+        with bare_main():
+            for lo, hi in chunks:
+                a, b = max(0, lo-pad), min(n, hi+pad)
+                src = (sg["store"], a, b) if sg.get("store") else sg["xyz"][a:b]   # ruta: sin copia
+                jobs.append(pool.submit(_chunk, src, sg["axes"], sg["fs"], lo-a, hi-a))
+        parts = [j.result() for j in jobs]
+    finally:
+        _release()
+    acc = parts[0][2]
+    for p in parts[1:]: acc.merge(p[2])
+    return np.concatenate([p[0] for p in parts]), np.concatenate([p[1] for p in parts]), acc
@@ -0,0 +1,88 @@
+"""Pipeline completo de análisis de una sesión."""
+import datetime
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from .config import ANALYZE_WORKERS, DEVICE_POSITIONS, STAGES
+from .dsp import preprocess, detect_steps, find_steps, signals
+from .metrics import calc_rei, calc_gss, calc_cad_asym, calc_fi
+from .profiling import profiled
+from .store import SignalStore
+
+
+def demo_data(dur=600, fs=100):
+    import pandas as pd
+    t=np.linspace(0,dur,dur*fs); np.random.seed(42)
+    fat=np.linspace(1,1.4,len(t)); ch=2.83
+    z=np.sin(2*np.pi*ch*t)*0.8*fat+np.random.normal(0,.15,len(t))+9.81
+    x=np.sin(2*np.pi*ch*t+np.pi/4)*0.3*fat+np.random.normal(0,.1,len(t))
+    y=np.sin(2*np.pi*ch*t+np.pi/2)*0.15+np.random.normal(0,.08,len(t))
+    accel=pd.DataFrame({'time':t,'x':x,'y':y,'z':z})
+    gt=np.arange(0,dur,1)
+    gps=pd.DataFrame({'time':gt,'speed':3+0.5*np.sin(2*np.pi*gt/120)})
+    return accel, gps
+
+class StageTimer:
+    """Tiempo de pared y de CPU por etapa; on_stage(pct, texto) se avisa al empezar cada una.
+    cpu_ms es thread_time del hilo que llama: no cuenta la CPU de otros procesos (parallel.py)."""
+    def __init__(self, on_stage=None):
+        self.on_stage=on_stage; self.stages=[]
+
+    @contextmanager
+    def stage(self, name):
+        if self.on_stage and name in STAGES: self.on_stage(*STAGES[name])
+        w0=time.perf_counter(); c0=time.thread_time()
+        try:
+            yield
+        finally:
+            self.stages.append({"stage":name,
+                                "wall_ms":round((time.perf_counter()-w0)*1000,1),
+                                "cpu_ms":round((time.thread_time()-c0)*1000,1)})
+
+@profiled
+def analyze(accel_df, gps_df, dev_name, timer=None, keep_signals=False, workers=ANALYZE_WORKERS):
+    """Analiza una sesión sin copiar ni modificar accel_df.
+    Con keep_signals=True el resultado incluye 'accel': el dict de señales
+    filtradas y de pisada (float32); por defecto se descarta tras las métricas.
+    Las sesiones largas se parten en bloques y se filtran en `workers` procesos
+    (ver parallel.py); workers=1 fuerza el análisis en serie."""
+    timer=timer or StageTimer()
+    dp=DEVICE_POSITIONS[dev_name]
+    if isinstance(gps_df,SignalStore): gps_df=gps_df.to_frame()   # pequeño; va al resultado
+    with timer.stage("preprocess"):
+        accel=signals(accel_df) if not isinstance(accel_df,dict) else accel_df
+        chunks=[(0,len(accel["time"]))]
+        if workers>1 and not keep_signals:
+            from .parallel import envelopes, plan
+            chunks=plan(len(accel["time"]),accel["fs"],workers)
+        if len(chunks)>1:       # filtrado y envolvente por bloques, en paralelo
+            env,asig,acc=envelopes(accel,chunks,workers)
+        else:
+            accel=preprocess(accel)
+    with timer.stage("detect_steps"):
+        if len(chunks)>1:
+            peaks=find_steps(env,accel["fs"]); pt=accel["time"][peaks]; pv=asig[peaks].astype(np.float64)
+            del env,asig
+        else:
+            _,pt,pv=detect_steps(accel,keep=keep_signals)
+    with timer.stage("metrics"):
+        rei=calc_rei(accel,pv) if len(chunks)==1 else acc.add_steps(pt,pv).rei()
+        gss=calc_gss(pv)
+        cad,asym=calc_cad_asym(pt)
+        ft,fv=calc_fi(accel,pt,pv)
+        dur=accel['time'].max()/60
+        spd=(np.mean(gps_df['speed'].values) if gps_df is not None and 'speed' in gps_df.columns
+             else len(pt)/2/(dur*60) if dur>0 else 0)
+        slope=float(np.polyfit(ft,fv,1)[0]) if len(fv)>=2 else 0
+    r={
+        "gps":gps_df,"pt":pt,"pv":pv,"fs":accel["fs"],"samples":len(accel["time"]),
+        "rei":rei,"gss":gss,"cadence":cad,"asymmetry":asym,
+        "fi_times":ft,"fi_values":fv,"dur":dur,"speed":spd,
+        "device":dev_name,"gss_good":dp["gss_good"],"gss_warn":dp["gss_warn"],
+        "fatigue_slope":slope,"steps":len(pt),
+        "date":datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+    }
+    if keep_signals: r["accel"]=accel
+    return r
@@ -0,0 +1,30 @@
+"""Utilidades para los pools de procesos "spawn" (render.py, parallel.py)."""
+import os
+import sys
+import threading
+import types
+from contextlib import contextmanager
+
+_main_lock = threading.RLock()
+
+
+@contextmanager
+def bare_main():
+    """Los procesos spawn reimportan __main__, que bajo Streamlit es app.py: se
+    oculta mientras el pool arranca procesos (ocurre dentro de submit). Con lock:
+    dos hilos anidados podrían dejar el módulo vacío como __main__."""
+    with _main_lock:
+        main = sys.modules.get("__main__")
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main
+
+
+def available_cpus():
+    """Núcleos que este proceso puede usar (afinidad/cpuset), no los del host."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:          # macOS, Windows
+        return os.cpu_count() or 1
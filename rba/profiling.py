@@ -0,0 +1,213 @@
+"""Instrumentación opcional del pipeline de análisis.
+
+Se activa con la variable de entorno RBA_PROFILE=1 (o con enable()). Cada función
+decorada con @profiled registra duración, tamaño de entrada, memoria pico
+(tracemalloc) y número de llamadas. Desactivada, el coste es comprobar un flag.
+
+    with profiling.trace("sesion") as tr:
+        analyze(...)
+    tr.save()          # Chrome trace: abrir en chrome://tracing o ui.perfetto.dev
+
+Los percentiles entre sesiones salen de stats() (en proceso) o de los traces
+guardados:  python -m rba.profiling [directorio]
+"""
+import functools
+import glob
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+PROFILE_DIR  = os.path.join(".rba_cache", "profiles")
+PROFILE_KEEP = 500     # traces guardados; se borran los más antiguos
+HISTORY_LEN  = 1000    # muestras por función para los percentiles en proceso
+
+_enabled = os.environ.get("RBA_PROFILE", "") not in ("", "0")
+_memory  = False
+_local   = threading.local()
+_lock    = threading.Lock()
+_calls   = defaultdict(int)
+_durations = defaultdict(lambda: deque(maxlen=HISTORY_LEN))
+_peaks     = defaultdict(lambda: deque(maxlen=HISTORY_LEN))
+
+
+def enable(on=True, memory=True):
+    """Activa/desactiva la instrumentación. memory=False evita el coste de tracemalloc."""
+    global _enabled, _memory
+    _enabled = on
+    _memory = on and memory
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    elif not _memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+if _enabled:
+    enable()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _calls.clear(); _durations.clear(); _peaks.clear()
+
+
+def _size(args):
+    try:
+        a = args[0] if args else None
+        if isinstance(a, dict) and "time" in a: return len(a["time"])   # señales de dsp.signals
+        return len(a) if a is not None else None
+    except TypeError:
+        return None
+
+
+class Trace:
+    """Eventos de una sesión de análisis, exportables en formato Chrome trace."""
+    def __init__(self, name):
+        self.name = name
+        self.events = []
+        self.t0 = time.perf_counter()
+
+    def add(self, name, t0, dur, size, peak):
+        args = {}
+        if size is not None: args["size"] = size
+        if peak is not None: args["peak_kb"] = round(peak / 1024, 1)
+        self.events.append({"name": name, "ph": "X", "pid": os.getpid(),
+                            "tid": threading.get_ident(),
+                            "ts": round((t0 - self.t0) * 1e6, 1),
+                            "dur": round(dur * 1e6, 1), "args": args})
+
+    def chrome_trace(self):
+        return {"traceEvents": self.events, "displayTimeUnit": "ms",
+                "otherData": {"session": self.name}}
+
+    def save(self, dirname=PROFILE_DIR):
+        os.makedirs(dirname, exist_ok=True)
+        path = os.path.join(dirname, f"{time.strftime('%Y%m%d-%H%M%S')}-{self.name}.json")
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        old = sorted(glob.glob(os.path.join(dirname, "*.json")), key=os.path.getmtime)
+        for p in old[:-PROFILE_KEEP]:
+            os.remove(p)
+        return path
+
+
+@contextmanager
+def trace(name):
+    """Recoge en un Trace los eventos @profiled de este hilo mientras dure el bloque."""
+    tr = Trace(name)
+    prev = getattr(_local, "trace", None)
+    _local.trace = tr
+    try:
+        yield tr
+    finally:
+        _local.trace = prev
+
+
+def _record(name, t0, dur, size, peak):
+    with _lock:
+        _calls[name] += 1
+        _durations[name].append(dur)
+        if peak is not None: _peaks[name].append(peak)
+    tr = getattr(_local, "trace", None)
+    if tr is not None:
+        tr.add(name, t0, dur, size, peak)
+
+
+def profiled(fn):
+    """Decorador de instrumentación; la memoria pico incluye la de las llamadas anidadas.
+
+    tracemalloc es global al proceso: con varias sesiones en paralelo los picos son aproximados.
+    """
+    name = fn.__name__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kw):
+        if not _enabled:
+            return fn(*args, **kw)
+        stack = _local.__dict__.setdefault("stack", [])
+        mem = _memory and tracemalloc.is_tracing()
+        frame = [0, 0]              # [memoria al entrar, pico observado]
+        if mem:
+            cur, peak = tracemalloc.get_traced_memory()
+            if stack: stack[-1][1] = max(stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [cur, cur]
+        stack.append(frame)
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kw)
+        finally:
+            dur = time.perf_counter() - t0
+            stack.pop()
+            peak = None
+            if mem:
+                frame[1] = max(frame[1], tracemalloc.get_traced_memory()[1])
+                peak = frame[1] - frame[0]
+                if stack: stack[-1][1] = max(stack[-1][1], frame[1])
+            _record(name, t0, dur, _size(args), peak)
+    return wrapper
+
+
+def _pct(vals, q):
+    s = sorted(vals)
+    return s[min(len(s) - 1, int(round(q / 100 * (len(s) - 1))))] if s else 0.0
+
+
+def _summarize(durs, peaks, calls):
+    out = {}
+    for name, d in durs.items():
+        p = peaks.get(name) or []
+        out[name] = {"calls": calls.get(name, len(d)),
+                     "p50_ms": round(_pct(d, 50) * 1000, 2),
+                     "p90_ms": round(_pct(d, 90) * 1000, 2),
+                     "p99_ms": round(_pct(d, 99) * 1000, 2),
+                     "max_ms": round(max(d) * 1000, 2) if d else 0.0,
+                     "peak_mb": round(max(p) / 2**20, 2) if p else None}
+    return out
+
+
+def stats():
+    """Percentiles por función de las últimas HISTORY_LEN llamadas de este proceso."""
+    with _lock:
+        return _summarize({k: list(v) for k, v in _durations.items()},
+                          {k: list(v) for k, v in _peaks.items()}, dict(_calls))
+
+
+def aggregate(paths):
+    """Percentiles por función a partir de traces guardados (una muestra por llamada)."""
+    durs, peaks, calls = defaultdict(list), defaultdict(list), defaultdict(int)
+    for path in paths:
+        with open(path) as f:
+            events = json.load(f).get("traceEvents", [])
+        for e in events:
+            calls[e["name"]] += 1
+            durs[e["name"]].append(e["dur"] / 1e6)
+            if "peak_kb" in e.get("args", {}):
+                peaks[e["name"]].append(e["args"]["peak_kb"] * 1024)
+    return _summarize(durs, peaks, calls)
+
+
+def format_table(summary):
+    lines = [f"{'función':<18}{'llamadas':>9}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'pico MB':>9}"]
+    for name, s in sorted(summary.items(), key=lambda kv: -kv[1]["p50_ms"]):
+        pk = f"{s['peak_mb']:.1f}" if s["peak_mb"] is not None else "—"
+        lines.append(f"{name:<18}{s['calls']:>9}{s['p50_ms']:>10.1f}{s['p90_ms']:>10.1f}"
+                     f"{s['p99_ms']:>10.1f}{pk:>9}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    d = sys.argv[1] if len(sys.argv) > 1 else PROFILE_DIR
+    paths = sorted(glob.glob(os.path.join(d, "*.json")))
+    if not paths:
+        sys.exit(f"sin traces en {d}")
+    print(f"{len(paths)} sesiones en {d}\n")
+    print(format_table(aggregate(paths)))
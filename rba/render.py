@@ -0,0 +1,91 @@
+"""Exportación de dashboards (PNG/PDF) en un pool de procesos acotado.
+
+El render de matplotlib ocupa la CPU durante segundos; hacerlo en el hilo del
+script bloquea a ese usuario y, con el GIL, a los demás. Los trabajos van a un
+pool "spawn" (no se hace fork de un servidor con hilos) con cola acotada; los
+pedidos iguales (misma clave) se comparten y el resultado queda en el LRU
+`derived`, donde la app ya lo busca.
+"""
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+from .cache import derived
+from .config import RENDER_MAX_PENDING, RENDER_WORKERS
+from .procs import bare_main
+
+FORMATS = {"png": ("dashboard_png", "image/png"), "pdf": ("dashboard_pdf", "application/pdf")}
+JOB_KEYS = ("rei","gss","cadence","asymmetry","fi_times","fi_values","speed","dur",
+            "gss_good","gss_warn","steps","date","pt","pv","gps")   # lo que usa build_fig
+
+_pool = None
+_jobs = {}      # clave → Future en cola o en curso
+_errors = {}    # clave → mensaje del último fallo
+_lock = threading.RLock()   # _finish puede correr dentro de submit (shutdown cancela futuros)
+
+
+def _render(fmt, r, pal, cad_series):
+    """Corre en el proceso del pool."""
+    from . import charts
+    return getattr(charts, FORMATS[fmt][0])(r, pal, cad_series=cad_series)
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=get_context("spawn"))
+    return _pool
+
+
+def _finish(key, fut):
+    with _lock:
+        _jobs.pop(key, None)
+        try:
+            derived.put(key, fut.result())
+        except Exception as e:
+            _errors[key] = f"{type(e).__name__}: {e}"
+
+
+def submit(key, fmt, r, pal, cad_series=None):
+    """Encola el render de r con la paleta pal; devuelve el estado (ver status)."""
+    with _lock:
+        if key in _jobs: return status(key)
+        if derived.get(key) is not None: return "done"
+        if len(_jobs) >= RENDER_MAX_PENDING:
+            raise RuntimeError("hay demasiadas exportaciones en curso; prueba en unos segundos")
+        _errors.pop(key, None)
+        job = {k: r[k] for k in JOB_KEYS if k in r}
+        try:
+            with bare_main():
+                fut = _get_pool().submit(_render, fmt, job, pal, cad_series)
+        except BrokenProcessPool:     # un worker murió: se descarta el pool y se reintenta
+            shutdown()
+            with bare_main():
+                fut = _get_pool().submit(_render, fmt, job, pal, cad_series)
+        _jobs[key] = fut
+    fut.add_done_callback(lambda f: _finish(key, f))
+    return status(key)
+
+
+def status(key):
+    """None (nunca pedido), "queued", "running", "done" o "error"."""
+    fut = _jobs.get(key)
+    if fut is not None:
+        return "running" if fut.running() else "queued"
+    if key in _errors: return "error"
+    return "done" if derived.get(key) is not None else None
+
+
+def error(key):
+    return _errors.get(key)
+
+
+def pending():
+    return len(_jobs)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True); _pool = None
@@ -0,0 +1,99 @@
+"""Almacén de señales en un solo archivo mapeado en memoria (.rba).
+
+Una sesión ingerida se escribe una vez y después se abre con mmap: time (float64),
+el bloque xyz (N, ejes) float32 sin NaN y speed/altitude (float32) si existen,
+cada uno alineado a 64 bytes detrás de una cabecera JSON. Las columnas son
+vistas de solo lectura sobre el mapa, así que signals() no copia nada y los
+procesos que abren el mismo archivo comparten sus páginas vía el cache del
+sistema operativo; al serializarse (pickle) viaja solo la ruta.
+
+    [8 B magia][8 B largo de cabecera][cabecera JSON][relleno][bloques...]
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+MAGIC = b"RBASIG\x00\x01"
+ALIGN = 64
+EXTRA_COLS = ("speed", "altitude")
+
+
+def _align(n): return -(-n//ALIGN)*ALIGN
+
+
+def write(path, df):
+    """Escribe df (time, x/y/z, speed, altitude) en path de forma atómica."""
+    from .dsp import est_fs
+    t = df['time'].to_numpy(dtype=np.float64)
+    axes = [ax for ax in ('x','y','z') if ax in df.columns]
+    blocks = {"time": t}
+    if axes: blocks["xyz"] = np.ascontiguousarray(df[axes].to_numpy(dtype=np.float32, na_value=0))
+    for c in EXTRA_COLS:
+        if c in df.columns: blocks[c] = df[c].to_numpy(dtype=np.float32, na_value=np.nan)
+    head = {"version": 1, "n": len(t), "fs": est_fs(t), "axes": axes, "blocks": {}}
+    hl = 256
+    while True:     # las posiciones dependen del largo de la cabecera, que las incluye
+        off = _align(16 + hl)
+        for name, a in blocks.items():
+            head["blocks"][name] = {"dtype": a.dtype.str, "shape": list(a.shape), "offset": off}
+            off = _align(off + a.nbytes)
+        hb = json.dumps(head).encode()
+        if len(hb) <= hl: break
+        hl = len(hb)
+    d = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=d, prefix=".tmp-", suffix=".rba")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + struct.pack("<Q", len(hb)) + hb)
+            for name, a in blocks.items():
+                f.seek(head["blocks"][name]["offset"]); a.tofile(f)
+            f.truncate(off)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp): os.remove(tmp)
+        raise
+
+
+class SignalStore:
+    """Sesión abierta desde un archivo .rba; columnas como vistas de solo lectura.
+
+    Acepta lo que analyze() usa de un DataFrame: columns, store['time'],
+    store['x'] (vista con paso sobre xyz) y to_frame() cuando hace falta uno real.
+    """
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        with open(self.path, 'rb') as f:
+            if f.read(8) != MAGIC: raise ValueError(f"{path}: no es un archivo de señales RBA")
+            (hl,) = struct.unpack("<Q", f.read(8)); head = json.loads(f.read(hl))
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.n = head["n"]; self.fs = head["fs"]; self.axes = head["axes"]
+        self.blocks = {name: np.frombuffer(self._mm, dtype=b["dtype"], count=int(np.prod(b["shape"])),
+                                           offset=b["offset"]).reshape(b["shape"])
+                       for name, b in head["blocks"].items()}
+
+    def __len__(self): return self.n
+    def __reduce__(self): return SignalStore, (self.path,)
+
+    @property
+    def time(self): return self.blocks["time"]
+    @property
+    def xyz(self): return self.blocks.get("xyz")
+    @property
+    def columns(self): return ["time", *self.axes, *(c for c in EXTRA_COLS if c in self.blocks)]
+
+    def __getitem__(self, col):
+        if col in self.axes: return self.xyz[:, self.axes.index(col)]
+        return self.blocks[col]
+
+    def signals(self):
+        """Mismo dict que dsp.signals(df), con vistas sobre el archivo y su ruta en 'store'."""
+        return {"time": self.time, "fs": self.fs, "axes": list(self.axes), "xyz": self.xyz,
+                "store": self.path}
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame({c: self[c] for c in self.columns})
@@ -0,0 +1,84 @@
+"""Acumuladores combinables frente a las reducciones de arreglos completos de metrics.py."""
+import numpy as np
+import pytest
+
+from rba.accum import IntervalStats, Moments, QuantileSketch, StepAccumulator
+from rba.metrics import calc_cad_asym
+
+# cortes con partes de largo par e impar, vacías y de un solo elemento
+SPLITS = [[500], [1, 2, 3], [7, 7, 0, 1, 250], [333, 0, 334]]
+
+
+def _parts(x, sizes):
+    edges = np.cumsum([0, *sizes, len(x) - sum(sizes)])
+    return [x[a:b] for a, b in zip(edges[:-1], edges[1:])]
+
+
+@pytest.fixture
+def x():
+    return np.random.default_rng(1).normal(3, 2, 1001)
+
+
+@pytest.mark.parametrize("sizes", SPLITS)
+def test_moments_merge(x, sizes):
+    acc = Moments()
+    for p in _parts(x, sizes): acc.merge(Moments().update(p))
+    assert acc.n == len(x)
+    assert acc.mean == pytest.approx(x.mean(), rel=1e-12)
+    assert acc.var == pytest.approx(np.var(x), rel=1e-12)
+    assert acc.abs_mean == pytest.approx(np.abs(x).mean(), rel=1e-12)
+
+
+def test_moments_empty():
+    m = Moments().merge(Moments()).update([])
+    assert (m.n, m.var, m.std, m.abs_mean) == (0, 0.0, 0.0, 0.0)
+
+
+@pytest.mark.parametrize("sizes", SPLITS)
+@pytest.mark.parametrize("q", [0, 0.5, 0.95, 1])
+def test_quantile_sketch_merge(x, sizes, q):
+    a = np.abs(x)
+    sk = QuantileSketch()
+    for p in _parts(a, sizes): sk.merge(QuantileSketch().update(p))
+    assert sk.n == len(a)
+    assert sk.quantile(q) == pytest.approx(np.percentile(a, 100*q), rel=2e-4)
+
+
+def test_quantile_sketch_zeros_and_negatives():
+    sk = QuantileSketch().update([0, 0, 0, 1.0])
+    assert sk.quantile(0.5) == 0.0 and sk.quantile(1) == pytest.approx(1.0, rel=2e-4)
+    with pytest.raises(ValueError):
+        sk.update([-1.0])
+    with pytest.raises(ValueError):
+        sk.merge(QuantileSketch(alpha=1e-3))
+
+
+@pytest.mark.parametrize("sizes", SPLITS)
+def test_interval_stats_parity(sizes):
+    iv = np.random.default_rng(2).uniform(0.3, 0.4, 1001)
+    st = IntervalStats()
+    for p in _parts(iv, sizes): st.merge(IntervalStats().update(p))
+    l, r = iv[0::2], iv[1::2]; n = min(len(l), len(r))
+    assert st.s_even == pytest.approx(l.sum()) and st.s_odd == pytest.approx(r.sum())
+    lm, rm = st.lr_means()
+    assert lm == pytest.approx(l[:n].mean()) and rm == pytest.approx(r[:n].mean())
+
+
+@pytest.mark.parametrize("sizes", SPLITS)
+def test_step_accumulator_matches_cad_asym(sizes):
+    # pasos alternados izquierda/derecha con intervalos fuera de rango
+    rng = np.random.default_rng(3)
+    iv = np.where(np.arange(1001) % 2, 0.36, 0.34) + rng.normal(0, 0.005, 1001)
+    iv[::97] = 1.5
+    pt = np.cumsum(iv)
+    acc = StepAccumulator()
+    for p in _parts(pt, sizes): acc.merge(StepAccumulator().update(p, np.ones(len(p))))
+    cad, asym = acc.cad_asym(); bc, ba = calc_cad_asym(pt)
+    assert acc.count == len(pt)
+    assert abs(cad - bc) <= 0.1 and abs(asym - ba) <= 0.02
+
+
+def test_step_accumulator_rejects_overlap():
+    a = StepAccumulator().update([1.0, 1.5], [1, 1])
+    with pytest.raises(ValueError):
+        a.merge(StepAccumulator().update([1.2, 2.0], [1, 1]))
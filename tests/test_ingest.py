@@ -0,0 +1,99 @@
+"""load_csv: lectura rápida y por bloques (pyarrow y pandas) frente a una referencia con pandas."""
+import io
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from rba import ingest
+from rba.ingest import load_csv
+
+N = 3000
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    t = 1.7e18 + np.arange(N)*1e7                  # ns de época, 100 Hz
+    return t, rng.normal(0, 3, (N, 3)).round(4)
+
+
+def _text(t, xyz, fmt, nl="\n", trailing=False, bom=False):
+    """CSV en uno de los formatos que exportan las apps."""
+    if fmt == "sensorlogger":
+        head = ["time", "seconds_elapsed", "z", "y", "x"]
+        rows = [[f"{ti:.0f}", f"{(ti-t[0])/1e9:.3f}", *(f"{v}" for v in a[::-1])] for ti, a in zip(t, xyz)]
+    elif fmt == "phyphox":
+        head = ["Time (s)", "Acceleration x (m/s^2)", "Acceleration y (m/s^2)", "Acceleration z (m/s^2)"]
+        rows = [[f"{(ti-t[0])/1e9:.3f}", *(f"{v}" for v in a)] for ti, a in zip(t, xyz)]
+    else:
+        head = ["timestamp", "x", "y", "z", "speed"]
+        rows = [[f"{ti:.0f}", *(f"{v}" for v in a), "3.1"] for ti, a in zip(t, xyz)]
+    end = "," if trailing else ""
+    s = nl.join(",".join(r) + end for r in [head, *rows]) + nl
+    return ("﻿" if bom else "") + s
+
+
+def _reference(text):
+    """Lo que load_csv debe devolver, calculado directamente con pandas."""
+    df = pd.read_csv(io.StringIO(text.lstrip("﻿")))
+    df.columns = [c.strip().lower() for c in df.columns]
+    if "seconds_elapsed" in df.columns:
+        t = df["seconds_elapsed"].to_numpy(float)
+    else:
+        t = df[next(c for c in df.columns if "time" in c)].to_numpy(float)
+        t = t*1e-9 if np.median(t) > 1e12 else t
+        t = t - t[0]
+    out = {"time": t}
+    for ax in "xyz":
+        col = next(c for c in df.columns if c == ax or c == f"acceleration {ax} (m/s^2)")
+        out[ax] = df[col].to_numpy(np.float32)
+    return out
+
+
+def _check(df, ref):
+    np.testing.assert_allclose(df["time"].to_numpy(), ref["time"], atol=1e-6)
+    for ax in "xyz":
+        np.testing.assert_array_equal(df[ax].to_numpy(np.float32), ref[ax])
+
+
+def _no_pyarrow(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    monkeypatch.setitem(sys.modules, "pyarrow.csv", None)
+
+
+VARIANTS = [dict(), dict(bom=True), dict(nl="\r\n"), dict(trailing=True),
+            dict(bom=True, nl="\r\n", trailing=True)]
+
+
+@pytest.mark.parametrize("fmt", ["sensorlogger", "phyphox", "generic"])
+@pytest.mark.parametrize("kw", VARIANTS)
+@pytest.mark.parametrize("path", ["fast", "stream", "fast-pandas", "stream-pandas"])
+def test_formats_and_paths(data, tmp_path, monkeypatch, fmt, kw, path):
+    text = _text(*data, fmt, **kw)
+    p = tmp_path/"s.csv"; p.write_bytes(text.encode())
+    if path.endswith("pandas"): _no_pyarrow(monkeypatch)
+    # bloques chicos: las uniones entre bloques caen dentro del archivo
+    monkeypatch.setattr(ingest, "CSV_BLOCK_BYTES", 4096)
+    monkeypatch.setattr(ingest, "CSV_CHUNK_ROWS", 700)
+    df = load_csv(str(p), stream=path.startswith("stream"))
+    assert len(df) == N
+    _check(df, _reference(text))
+    if fmt == "generic": assert "speed" in df.columns
+
+
+@pytest.mark.parametrize("stream", [False, True])
+def test_non_numeric_cells_become_nan(data, tmp_path, stream):
+    lines = _text(*data, "generic").split("\n")
+    cells = lines[11].split(","); cells[1] = "n/a"; lines[11] = ",".join(cells)   # x de la fila 10
+    p = tmp_path/"s.csv"; p.write_text("\n".join(lines))
+    df = load_csv(str(p), stream=stream)
+    assert len(df) == N and np.isnan(df["x"].iloc[10]) and np.isfinite(df["x"].drop(index=10)).all()
+
+
+def test_file_like_and_missing_time(data):
+    text = _text(*data, "phyphox", bom=True)
+    _check(load_csv(io.BytesIO(text.encode())), _reference(text))
+    with pytest.raises(KeyError):
+        load_csv(io.BytesIO(b"a,b\n1,2\n"), stream=True)
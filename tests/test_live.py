@@ -0,0 +1,100 @@
+"""LiveHub y el servidor de ingesta."""
+import json
+import socket
+
+import numpy as np
+import pytest
+
+from rba import live
+
+
+def _feed(hub, athlete, t0, t1, fs=100, batch=20):
+    t = np.arange(int(t0*fs), int(t1*fs))/fs; xyz = live.synth(t, seed=1)
+    for a in range(0, len(t), batch):
+        hub.push(athlete, fs, t[a:a+batch], xyz[a:a+batch])
+    return t, xyz
+
+
+def test_overlapping_batch_keeps_session():
+    hub = live.LiveHub()
+    _feed(hub, "A", 0, 12)
+    before = hub.snapshot("A")
+    assert before["steps"] > 0
+    t = np.array([11.8, 11.81]); hub_s = hub.get("A")
+    with pytest.raises(live.StaleBatch):
+        hub.push("A", 100, t, live.synth(t))
+    after = hub.snapshot("A")
+    assert hub.get("A") is hub_s
+    assert after["steps"] == before["steps"] and after["elapsed"] == before["elapsed"]
+    assert after["received"] == before["received"]
+
+
+def test_partial_overlap_keeps_only_new_samples():
+    hub = live.LiveHub()
+    _feed(hub, "A", 0, 12)
+    n = hub.snapshot("A")["received"]
+    t = np.arange(1190, 1250)/100      # 11.90–12.49: las primeras 10 ya llegaron
+    hub.push("A", 100, t, live.synth(t))
+    assert hub.snapshot("A")["received"] == n + 50
+
+
+def test_reset_fs_change_and_gap_start_new_sessions():
+    hub = live.LiveHub()
+    _feed(hub, "A", 0, 12)
+    s = hub.get("A")
+    t = np.arange(0, 20)/100
+    hub.push("A", 100, t, live.synth(t), reset=True)
+    assert hub.get("A") is not s and hub.snapshot("A")["received"] == 20
+    s = hub.get("A"); hub.push("A", 50, t+1, live.synth(t+1))
+    assert hub.get("A") is not s
+    s = hub.get("A"); t2 = t + 1 + live.LIVE_GAP_S + 10
+    hub.push("A", 50, t2, live.synth(t2))
+    assert hub.get("A") is not s
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(live, "hub", live.LiveHub())
+    host, port = live.start_server("127.0.0.1", 0, token=None)
+    yield port
+    live.stop_server()
+
+
+def _raw(port, head, body=b""):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as s:
+        s.sendall(head.encode() + b"\r\n" + body)
+        data = b""
+        while chunk := s.recv(65536): data += chunk
+    status = int(data.split(b" ", 2)[1])
+    return status, json.loads(data.split(b"\r\n\r\n", 1)[1] or b"null")
+
+
+def _post(port, path, body, length=None, ctype="application/json"):
+    head = f"POST {path} HTTP/1.0\r\nHost: 127.0.0.1:{port}\r\nContent-Type: {ctype}\r\n"
+    if length is not False: head += f"Content-Length: {len(body) if length is None else length}\r\n"
+    return _raw(port, head, body if length is None else b"")
+
+
+def test_http_ingest_and_retry(server):
+    t = np.arange(0, 200)/100; xyz = live.synth(t)
+    body = json.dumps({"fs": 100, "t": t.tolist(), "x": xyz[:, 0].tolist(),
+                       "y": xyz[:, 1].tolist(), "z": xyz[:, 2].tolist()}).encode()
+    assert _post(server, "/ingest/Ana", body)[0] == 200
+    assert _post(server, "/ingest/Ana", body)[0] == 409          # reintento del mismo bloque
+    assert _post(server, "/ingest/Ana?reset=1", body)[0] == 200
+
+
+@pytest.mark.parametrize("length,status", [(False, 411), ("-1", 400), ("abc", 400), ("0", 400),
+                                           (str(live.LIVE_MAX_BODY+1), 413)])
+def test_http_rejects_bad_content_length(server, length, status):
+    assert _post(server, "/ingest/Ana", b"{}", length=length)[0] == status
+
+
+def test_http_requires_json_and_local_host(server):
+    assert _post(server, "/ingest/Ana", b"{}", ctype="text/plain")[0] == 415
+    assert _raw(server, "GET /live HTTP/1.0\r\nHost: evil.example\r\n")[0] == 403
+
+
+def test_non_loopback_requires_token():
+    with pytest.raises(ValueError):
+        live.start_server("0.0.0.0", 0, token=None)
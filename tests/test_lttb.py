@@ -0,0 +1,50 @@
+"""Diezmado LTTB de las series de los gráficos."""
+import numpy as np
+import pytest
+
+from rba.charts import decimate, lttb, max_points
+
+
+@pytest.fixture
+def series():
+    x = np.linspace(0, 60, 6001)
+    return x, np.sin(2*np.pi*2.8*x) + np.random.default_rng(0).normal(0, 0.1, len(x))
+
+
+@pytest.mark.parametrize("n", [6001, 10_000, 2, 0])
+def test_no_reduction(series, n):
+    x, y = series
+    np.testing.assert_array_equal(lttb(x, y, n), np.arange(len(x)))
+
+
+def test_decimate_without_copy_when_it_fits(series):
+    x, y = series
+    dx, dy = decimate(x, y, len(x))
+    assert dx is x and dy is y
+
+
+@pytest.mark.parametrize("n", [3, 4, 100, 1234, 6000])
+def test_one_point_per_bucket_with_endpoints(series, n):
+    x, y = series
+    i = lttb(x, y, n)
+    assert len(i) == n and i[0] == 0 and i[-1] == len(x) - 1
+    assert np.all(np.diff(i) > 0)
+    edges = np.linspace(1, len(x) - 1, n - 1).astype(np.int64)
+    assert np.all((i[1:-1] >= edges[:-1]) & (i[1:-1] < np.append(edges[1:-1], len(x))))
+
+
+def test_keeps_isolated_peaks():
+    x = np.arange(10_000, dtype=float); y = np.zeros_like(x)
+    spikes = [1234, 5000, 8765]
+    y[spikes] = [5, -3, 8]
+    i = lttb(x, y, 200)
+    assert set(spikes) <= set(i.tolist())
+
+
+def test_decimate_and_max_points(series):
+    x, y = series
+    n = max_points(1200, panels=2)
+    dx, dy = decimate(x, y, n)
+    assert len(dx) == len(dy) == n == 1200
+    assert dx[0] == x[0] and dx[-1] == x[-1]
+    assert max_points(4) == 16          # mínimo para paneles muy angostos
@@ -0,0 +1,41 @@
+"""El detector en línea frente a detect_steps (lo que mide python -m rba.online)."""
+import numpy as np
+import pytest
+
+from rba.online import OnlineStepDetector, compare, run_online
+from rba.pipeline import demo_data
+
+
+@pytest.fixture(scope="module")
+def demo():
+    return demo_data(600)[0]
+
+
+def test_matches_batch_on_demo(demo):
+    r = compare(demo, chunk_s=0.5, tol=0.1)
+    assert r["recall"] >= 0.9 and r["precision"] >= 0.88
+    assert abs(r["offset_median_ms"]) <= 10
+    assert abs(r["cadence_online"] - r["cadence_batch"]) <= 1.0
+    assert abs(r["gss_online"] - r["gss_batch"]) <= 0.02
+
+
+def test_latency_is_bounded(demo):
+    _, _, det = run_online(demo, chunk_s=0.5)
+    assert max(det.latencies) <= det.delay + det.lookahead + 0.5 + 0.1
+
+
+def test_block_size_does_not_change_much(demo):
+    a, _, _ = run_online(demo, chunk_s=0.5)
+    b, _, _ = run_online(demo, chunk_s=0.2)
+    assert abs(len(a) - len(b)) <= 0.02*len(a)
+    assert len(np.intersect1d(a, b)) >= 0.9*len(a)
+
+
+def test_single_axis_and_empty_blocks():
+    df = demo_data(60)[0]
+    det = OnlineStepDetector(100)
+    assert len(det.push([], np.empty((0, 3)))[0]) == 0
+    t, z = df["time"].to_numpy(), df["z"].to_numpy()
+    n = sum(len(det.push(t[a:a+50], z[a:a+50])[0]) for a in range(0, len(t), 50))
+    n += len(det.flush()[0])
+    assert 120 <= n <= 200
@@ -0,0 +1,46 @@
+"""analyze() por bloques en el pool frente a analyze() en serie (tolerancia de rba/parallel.py)."""
+import numpy as np
+import pytest
+
+from rba import parallel, store
+from rba.pipeline import analyze, demo_data
+
+DEV = "Espalda / Canguro"
+
+
+@pytest.fixture(scope="module")
+def demo():
+    return demo_data(2*3600)[0]
+
+
+@pytest.fixture
+def chunked(monkeypatch):
+    """Fuerza la partición: 2 procesos aunque la máquina tenga un núcleo y sesiones cortas."""
+    monkeypatch.setattr(parallel, "available_cpus", lambda: 2)
+    monkeypatch.setattr(parallel, "CHUNK_MIN_SAMPLES", 100_000)
+    yield
+    parallel.shutdown()
+
+
+def _same(a, b):
+    np.testing.assert_array_equal(a["pt"], b["pt"])
+    np.testing.assert_allclose(a["pv"], b["pv"], rtol=1e-5)
+    for k in ("steps", "cadence", "asymmetry", "gss"):
+        assert a[k] == b[k], k
+    np.testing.assert_allclose(a["fi_values"], b["fi_values"], rtol=1e-4)
+    assert a["fatigue_slope"] == pytest.approx(b["fatigue_slope"], rel=1e-3, abs=1e-6)
+    assert abs(a["rei"] - b["rei"]) <= 0.1 + 1e-9
+
+
+def test_plan_splits(demo, chunked):
+    assert len(parallel.plan(len(demo), 100, workers=2)) == 2
+
+
+def test_chunked_matches_serial(demo, chunked):
+    _same(analyze(demo, None, DEV, workers=2), analyze(demo, None, DEV, workers=1))
+
+
+def test_chunked_from_store_matches_serial(demo, chunked, tmp_path):
+    store.write(tmp_path/"s.rba", demo)
+    s = store.SignalStore(tmp_path/"s.rba")
+    _same(analyze(s, None, DEV, workers=2), analyze(demo, None, DEV, workers=1))